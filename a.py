@@ -1,21 +1,49 @@
-from mypy import nodes
-from mypy import types
-from mypy.plugin import ClassDefContext
-from mypy.typevars import fill_typevars
+from typing import Any, Callable, Optional, Type
+
+from mypy import nodes, types
+from mypy.plugin import ClassDefContext, Plugin, ReportConfigContext
 from mypy.plugins.common import add_method_to_class
-from typing import Callable, Optional, Type
+from mypy.typevars import fill_typevars
+from mypy.version import __version__ as mypy_version
+
+# bump whenever the generated signatures change, so that mypy drops cached modules built by an
+# older version of the plugin
+VERSION = 2
+METADATA_KEY = "enum_map"
+TVAR_NAME = "__EnumMapT"
+# type variables take a default from mypy 1.4 on
+HAS_TYPEVAR_DEFAULTS = tuple(map(int, mypy_version.split(".")[:2])) >= (1, 4)
 
 
 def add_enum_map_signature(ctx: ClassDefContext) -> None:
-    print([x.node for x in ctx.cls.info.names.values()])
+    info = ctx.cls.info
     enum_members = [
         member
-        for member, symbol_table in ctx.cls.info.names.items()
+        for member, symbol_table in info.names.items()
         if isinstance(symbol_table.node, nodes.Var)
     ]
 
+    # the hook runs again whenever semantic analysis of the class is deferred, and classes loaded
+    # from the cache keep both the generated method and this metadata, so only build it once
+    existing = info.names.get("map")
+    if (
+        existing is not None
+        and existing.plugin_generated
+        and info.metadata.get(METADATA_KEY) == {"version": VERSION, "members": enum_members}
+    ):
+        return
+
+    # mypy binds a method's type variables by looking their names up from the method, so the
+    # variable needs a symbol in the class; it can't be mistaken for a member as it isn't a Var
     obj = ctx.api.named_type("builtins.object")
-    t_var = types.TypeVarType("T", "T", -1, [], obj)
+    defaults: dict[str, Any] = {}
+    if HAS_TYPEVAR_DEFAULTS:
+        defaults["default"] = types.AnyType(types.TypeOfAny.from_omitted_generics)
+    fullname = f"{info.fullname}.{TVAR_NAME}"
+    t_var_expr = nodes.TypeVarExpr(TVAR_NAME, fullname, [], obj, **defaults)
+    info.names[TVAR_NAME] = nodes.SymbolTableNode(nodes.MDEF, t_var_expr)
+    t_var_id = types.TypeVarId(-1, namespace=f"{info.fullname}.map")
+    t_var = types.TypeVarType(TVAR_NAME, fullname, t_var_id, [], obj, **defaults)
 
     args = [
         nodes.Argument(
@@ -27,8 +55,9 @@ def add_enum_map_signature(ctx: ClassDefContext) -> None:
         for member in enum_members
     ]
 
-    self_type = types.TypeType(fill_typevars(ctx.cls.info))
-    return_type = ctx.api.named_type("builtins.dict", [self_type, t_var])
+    instance_type = fill_typevars(info)
+    self_type = types.TypeType(instance_type)
+    return_type = ctx.api.named_type("builtins.dict", [instance_type, t_var])
 
     add_method_to_class(
         api=ctx.api,
@@ -40,9 +69,7 @@ def add_enum_map_signature(ctx: ClassDefContext) -> None:
         is_classmethod=True,
         tvar_def=t_var,
     )
-
-
-from mypy.plugin import Plugin
+    info.metadata[METADATA_KEY] = {"version": VERSION, "members": enum_members}
 
 
 class EnumMapPlugin(Plugin):
@@ -54,6 +81,9 @@ class EnumMapPlugin(Plugin):
             return add_enum_map_signature
         return None
 
+    def report_config_data(self, ctx: ReportConfigContext) -> Any:
+        return {"enum_map_plugin": VERSION}
+
 
 def plugin(version: str) -> Type[Plugin]:
     return EnumMapPlugin
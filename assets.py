@@ -0,0 +1,88 @@
+import base64
+import re
+import struct
+import zlib
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional, Tuple
+
+IMG = re.compile(r"<img\b[^>]*>", re.I)
+DATA_URI = re.compile(r"""(["'])data:image/([\w.+-]+);base64,([A-Za-z0-9+/=\s]+)\1""", re.I)
+EXTENSIONS = {"jpeg": "jpg", "svg+xml": "svg"}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_chunks(data: bytes) -> list[Tuple[bytes, bytes]]:
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        chunks.append((data[pos + 4 : pos + 8], data[pos + 8 : pos + 8 + length]))
+        pos += length + 12
+    return chunks
+
+
+def png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def deflate_png(data: bytes) -> bytes:
+    chunks = png_chunks(data)
+    pixels = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    out = [PNG_SIGNATURE]
+    idat_written = False
+    for kind, body in chunks:
+        if kind != b"IDAT":
+            out.append(png_chunk(kind, body))
+        elif not idat_written:
+            out.append(png_chunk(b"IDAT", zlib.compress(pixels, 9)))
+            idat_written = True
+    deflated = b"".join(out)
+    return deflated if len(deflated) < len(data) else data
+
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    if data.startswith(PNG_SIGNATURE):
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        width, height = struct.unpack("<HH", data[6:10])
+        return width, height
+    return None
+
+
+def save_asset(data: bytes, subtype: str, asset_dir: Path) -> str:
+    name = f"{sha256(data).hexdigest()[:16]}.{EXTENSIONS.get(subtype, subtype)}"
+    asset_dir.mkdir(parents=True, exist_ok=True)
+    if not (asset_dir / name).is_file():
+        (asset_dir / name).write_bytes(data)
+    return name
+
+
+def extract_images(
+    html: str, asset_dir: Path, url_prefix: str = "/assets/", deflate: bool = False
+) -> str:
+    def replace(img: re.Match[str]) -> str:
+        tag = img.group()
+        uri = DATA_URI.search(tag)
+        if not uri:
+            return tag
+        quote, subtype, payload = uri.groups()
+        data = base64.b64decode(re.sub(r"\s", "", payload))
+        if deflate and data.startswith(PNG_SIGNATURE):
+            data = deflate_png(data)
+        src = quote + url_prefix + save_asset(data, subtype.lower(), asset_dir) + quote
+        tag = tag[: uri.start()] + src + tag[uri.end() :]
+
+        extra = []
+        size = image_size(data)
+        if size and not re.search(r"\s(width|height)=", tag, re.I):
+            extra.append('width="{}" height="{}"'.format(*size))
+        if not re.search(r"\sloading=", tag, re.I):
+            extra.append('loading="lazy"')
+        if not extra:
+            return tag
+        end = -2 if tag.endswith("/>") else -1
+        return f"{tag[:end].rstrip()} {' '.join(extra)}{tag[end:]}"
+
+    return IMG.sub(replace, html)
@@ -0,0 +1,100 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from automata.ensemble import Ensemble
+
+MULTIPLIERS = np.random.default_rng(0x5EED).integers(0, 2**63, size=2**16, dtype=np.uint64) | 1
+
+
+def digest(ca: Any) -> int:
+    packed = ca.packed() if hasattr(ca, "packed") else np.packbits(np.asarray(ca.cells, np.uint8))
+    return hash(packed.tobytes())
+
+
+def find_cycle(ca: Any, rule: Any, max_steps: int) -> Optional[tuple[int, int]]:
+    """Step ``ca`` until it revisits a state and return ``(transient_length, period)``, or None
+    if that doesn't happen within ``max_steps``. ``ca`` is left on the first repeated state.
+
+    States are remembered by a 64-bit digest, so memory grows by one dict entry per generation
+    rather than one state.
+    """
+    seen = {digest(ca): 0}
+    for t in range(1, max_steps + 1):
+        ca.apply_rule(rule)
+        d = digest(ca)
+        if d in seen:
+            return seen[d], t - seen[d]
+        seen[d] = t
+    return None
+
+
+def row_digests(cells: np.ndarray) -> np.ndarray:
+    packed = np.packbits(cells, axis=1)
+    padded = np.zeros((len(cells), -(-packed.shape[1] // 8) * 8), dtype=np.uint8)
+    padded[:, : packed.shape[1]] = packed
+    words = padded.view("<u8")
+    digests: np.ndarray = (words * MULTIPLIERS[np.arange(words.shape[1]) % len(MULTIPLIERS)]).sum(1)
+    return digests
+
+
+def ensemble_cycles(ens: Ensemble, max_steps: int) -> tuple[np.ndarray, np.ndarray]:
+    """``(transient_length, period)`` of every member of ``ens``, -1 where no cycle closes
+    within ``max_steps``; ``ens`` itself is not advanced.
+
+    Periods come from Brent's algorithm run on all members at once, each member leaving the
+    batch as soon as its cycle closes; transients are then found by racing a copy started
+    ``period`` generations ahead against one started at the beginning.
+    """
+    nmembers = len(ens.rule_ids)
+    transient = np.full(nmembers, -1)
+    period = np.full(nmembers, -1)
+    members = np.arange(nmembers)
+    hare = ens.subset(members)
+    tortoise = hare.cells.copy()
+    tortoise_digests = row_digests(tortoise)
+    power = np.ones(nmembers, dtype=np.int64)
+    lam = np.zeros(nmembers, dtype=np.int64)
+
+    for _ in range(max_steps):
+        if not len(members):
+            break
+        hare.advance()
+        lam += 1
+        digests = row_digests(hare.cells)
+        candidates = np.flatnonzero(digests == tortoise_digests)
+        same = (hare.cells[candidates] == tortoise[candidates]).all(axis=1)
+        found = candidates[same]
+        if len(found):
+            period[members[found]] = lam[found]
+            keep = np.ones(len(members), dtype=bool)
+            keep[found] = False
+            members, hare = members[keep], hare.subset(keep)
+            tortoise, tortoise_digests = tortoise[keep], tortoise_digests[keep]
+            power, lam, digests = power[keep], lam[keep], digests[keep]
+        restart = power == lam
+        tortoise[restart] = hare.cells[restart]
+        tortoise_digests[restart] = digests[restart]
+        power[restart] *= 2
+        lam[restart] = 0
+
+    members = np.flatnonzero(period > 0)
+    lam = period[members]
+    start = ens.subset(members)
+    ahead = ens.subset(members)
+    previous = np.empty_like(ahead.cells)
+    for steps in range(1, int(lam.max(initial=0)) + 1):
+        previous[...] = ahead.cells
+        ahead.advance()
+        ahead.cells[lam < steps] = previous[lam < steps]
+
+    mu = 0
+    while len(members):
+        met = (start.cells == ahead.cells).all(axis=1)
+        transient[members[met]] = mu
+        members, lam = members[~met], lam[~met]
+        start, ahead = start.subset(~met), ahead.subset(~met)
+        start.advance()
+        ahead.advance()
+        mu += 1
+    return transient, period
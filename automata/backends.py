@@ -0,0 +1,129 @@
+import json
+import os
+import platform
+import random
+from pathlib import Path
+from timeit import default_timer
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+from automata.bitpacked import CABitPacked
+from automata.inplace import CAInPlace
+from automata.lightcone import CALightCone
+from automata.reference import CAOpt1, CAOpt2, CAOpt3, CARef
+from automata.sliding import CASliding
+
+
+class Backend(NamedTuple):
+    """An engine with the ``CARef`` interface and the shapes it can run: ``max_k`` bounds the
+    neighbourhood whose rule it builds and steps in about a second (tuning benchmarks every
+    candidate) and ``max_ncells`` keeps pure-Python engines out of benchmarks they can't win.
+
+    Every engine's ``apply_rule`` takes any engine's ``make_rule`` table, or any sequence of 0s
+    and 1s, so code written against ``make_automaton`` doesn't depend on the backend it gets."""
+
+    CAutomaton: Any
+    max_k: int
+    max_ncells: Optional[int] = None
+
+
+BACKENDS: dict[str, Backend] = {}
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "automata"
+
+
+def register(name: str, CAutomaton: Any, max_k: int, max_ncells: Optional[int] = None) -> None:
+    BACKENDS[name] = Backend(CAutomaton, max_k, max_ncells)
+
+
+# rules built through CARef.make_rule's list take seconds and hundreds of MB past k = 22, the
+# Shannon expansion of a random rule past k = 18, the bytes of CASliding.make_rule past k = 28
+register("ref", CARef, 22, 2**14)
+register("opt1", CAOpt1, 22, 2**14)
+register("opt2", CAOpt2, 22)
+register("opt3", CAOpt3, 22)
+register("bitpacked", CABitPacked, 18)
+register("inplace", CAInPlace, 22)
+register("sliding", CASliding, 28)
+register("lightcone", CALightCone, 22)
+
+
+def candidates(ncells: int, k: int) -> list[str]:
+    return [
+        name
+        for name, backend in BACKENDS.items()
+        if k <= backend.max_k and (backend.max_ncells is None or ncells <= backend.max_ncells)
+    ]
+
+
+def bucket(n: int) -> int:
+    return max(n - 1, 0).bit_length()
+
+
+def cache_path() -> Path:
+    machine = "-".join([platform.node(), platform.machine(), platform.python_version()])
+    return CACHE_DIR / f"autotune-{machine}-numpy{np.__version__}.json"
+
+
+def benchmark(name: str, ncells: int, k: int, steps: int, budget: float = 0.2) -> float:
+    """Estimated seconds to build ``name`` and run ``steps`` generations: the set-up is timed once
+    and generations are timed until ``budget`` seconds or ``steps`` of them have passed.
+
+    The rule is random but fixed per ``k``, since a rule as regular as 85 would flatter
+    ``CABitPacked``, whose cost depends on how far the rule's logic simplifies."""
+    CAutomaton = BACKENDS[name].CAutomaton
+    init = np.random.default_rng(0).integers(0, 2, size=ncells)
+    rule_id = random.Random(k).getrandbits(2**k)
+    start = default_timer()
+    ca = CAutomaton(ncells, k, init=init)
+    rule = CAutomaton.make_rule(rule_id, k)
+    ca.apply_rule(rule)
+    setup = default_timer() - start
+
+    start = default_timer()
+    timed = 0
+    while timed < steps and default_timer() - start < budget:
+        ca.apply_rule(rule)
+        timed += 1
+    per_step = (default_timer() - start) / max(timed, 1)
+    return setup + (steps - 1) * per_step
+
+
+def tune(ncells: int, k: int, steps: int, path: Optional[Path] = None) -> str:
+    """Fastest backend for ``ncells``, ``k`` and ``steps``, looked up in the per-machine cache or
+    benchmarked at the top of their power-of-two buckets and then cached."""
+    path = path or cache_path()
+    key = f"{bucket(ncells)},{k},{bucket(steps)}"
+    cache = json.loads(path.read_text()) if path.exists() else {}
+    if key in cache and cache[key]["backend"] in BACKENDS:
+        backend: str = cache[key]["backend"]
+        return backend
+
+    size, nsteps = 2 ** bucket(ncells), 2 ** bucket(steps)
+    timings = {name: benchmark(name, size, k, nsteps) for name in candidates(size, k)}
+    if not timings:
+        raise ValueError(f"no backend runs {ncells} cells with k={k}")
+    backend = min(timings, key=timings.__getitem__)
+    cache[key] = {"backend": backend, "timings": timings}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(cache, indent=4, sort_keys=True))
+    return backend
+
+
+def make_automaton(
+    ncells: int, k: int, init: Any = "center", backend: str = "auto", steps: int = 1
+) -> Any:
+    """A ``CARef``-like automaton from the named backend or, with ``"auto"``, from the one that
+    ``tune`` finds fastest for a run of ``steps`` generations on this machine."""
+    if backend == "auto":
+        backend = tune(ncells, k, steps)
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {list(BACKENDS)}")
+    return BACKENDS[backend].CAutomaton(ncells, k, init)
+
+
+if __name__ == "__main__":
+    for ncells in (16, 250, 10**4, 10**6):
+        for steps in (1, 100):
+            ca = make_automaton(ncells, 3, steps=steps)
+            print(f"{ncells} cells, {steps} steps: {type(ca).__name__}")
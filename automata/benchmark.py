@@ -0,0 +1,121 @@
+import json
+import sys
+import tracemalloc
+from itertools import product
+from pathlib import Path
+from timeit import default_timer
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from automata.backends import BACKENDS, candidates
+from automata.reference import test
+
+
+def measure(
+    CAutomaton: Any, ncells: int, k: int, steps: int, rule_id: int, warmups: int, repeats: int
+) -> dict[str, float]:
+    """Time ``steps`` generations ``repeats`` times after ``warmups`` untimed runs, each from the
+    same initial state, then run them once more under tracemalloc for the peak allocation."""
+    init = np.random.default_rng(0).integers(0, 2, size=ncells)
+    rule = CAutomaton.make_rule(rule_id, k)
+    times = []
+    for i in range(warmups + repeats):
+        ca = CAutomaton(ncells, k, init=init)
+        start = default_timer()
+        for _ in range(steps):
+            ca.apply_rule(rule)
+        if i >= warmups:
+            times.append(default_timer() - start)
+
+    ca = CAutomaton(ncells, k, init=init)
+    tracemalloc.start()
+    try:
+        for _ in range(steps):
+            ca.apply_rule(rule)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    return {
+        "median": median,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "per_cell_step": median / (ncells * steps),
+        "peak_bytes": peak,
+    }
+
+
+def benchmark(
+    ncells: Iterable[int] = (250, 10**4, 10**5, 10**6),
+    ks: Iterable[int] = (3, 5),
+    steps: Iterable[int] = (10,),
+    backends: Optional[Iterable[str]] = None,
+    rule_id: int = 110,
+    warmups: int = 1,
+    repeats: int = 7,
+    path: Optional[Path] = None,
+) -> list[dict[str, Any]]:
+    """Every backend over the grid of ``ncells × ks × steps`` it can run, checked with ``test``
+    against ``CARef`` once per ``k`` before it is timed. Results are printed as they come and
+    written to ``path`` as JSON."""
+    names = list(backends or BACKENDS)
+    checked: set[tuple[str, int]] = set()
+    results = []
+    for n, k, nsteps in product(ncells, ks, steps):
+        for name in names:
+            if name not in candidates(n, k):
+                continue
+            CAutomaton = BACKENDS[name].CAutomaton
+            if (name, k) not in checked:
+                test(CAutomaton, rule_id, k)
+                checked.add((name, k))
+            stats = measure(CAutomaton, n, k, nsteps, rule_id, warmups, repeats)
+            results.append({"backend": name, "ncells": n, "k": k, "steps": nsteps, **stats})
+            print(
+                f"{name:>10} ncells={n} k={k} steps={nsteps}: median {stats['median']:.2e} s "
+                f"(IQR {stats['iqr']:.1e}), {stats['per_cell_step']:.2e} s/cell/step, "
+                f"peak {stats['peak_bytes']:.0f} B"
+            )
+    if path is not None:
+        path.write_text(json.dumps(results, indent=4))
+    return results
+
+
+def plot(results: list[dict[str, Any]], path: Path) -> None:
+    """Log-log median time per generation against ``ncells``, one line per backend and ``k``, or
+    nothing if matplotlib isn't installed."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed, skipping the plot", file=sys.stderr)
+        return
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    lines = sorted({(r["backend"], r["k"], r["steps"]) for r in results})
+    for name, k, steps in lines:
+        points = sorted(
+            (r["ncells"], r["median"] / steps, r["q1"] / steps, r["q3"] / steps)
+            for r in results
+            if (r["backend"], r["k"], r["steps"]) == (name, k, steps)
+        )
+        x, y, lo, hi = map(np.array, zip(*points))
+        ax.errorbar(x, y, yerr=[y - lo, hi - y], marker="o", label=f"{name}, k={k}")
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("ncells")
+    ax.set_ylabel("seconds per generation")
+    ax.legend()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    out = Path(sys.argv[1] if len(sys.argv) > 1 else "benchmark")
+    results = benchmark(path=out.with_suffix(".json"))
+    plot(results, out.with_suffix(".png"))
@@ -0,0 +1,182 @@
+from typing import Any, Union
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+from automata.runner import Runner
+
+WORD = 64
+ZERO, ONES = np.uint64(0), np.uint64(2**WORD - 1)
+
+Bits = Union[np.ndarray, np.uint64]
+Program = list[tuple[str, int, int, int]]
+
+
+def pack(cells: Any) -> np.ndarray:
+    bits = np.asarray(cells, dtype=np.uint8)
+    padded = np.zeros(-(-bits.shape[-1] // WORD) * WORD, dtype=np.uint8)
+    padded[: bits.shape[-1]] = bits
+    return np.packbits(padded, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def unpack(words: np.ndarray, ncells: int) -> np.ndarray:
+    return np.unpackbits(words.astype("<u8").view(np.uint8), bitorder="little")[:ncells]
+
+
+def select(hi: int, lo: int) -> str:
+    if (hi, lo) == (1, 0):
+        return "x"
+    if (hi, lo) == (0, 1):
+        return "not"
+    if lo == 0:
+        return "and"
+    if hi == 0:
+        return "andnot"
+    if hi == 1:
+        return "or"
+    if lo == 1:
+        return "ornot"
+    return "mux"
+
+
+def compile_rule(rule: Any) -> tuple[Program, int]:
+    """Shannon-expand a rule table into word operations, most significant neighbour first.
+
+    Registers 0 and 1 hold the constants, each instruction ``(op, var, hi, lo)`` writes the next
+    register, and identical sub-tables share one register.
+    """
+    program: Program = []
+    registers: dict[bytes, int] = {}
+
+    def expand(table: np.ndarray) -> int:
+        if not table.any():
+            return 0
+        if table.all():
+            return 1
+        key = table.tobytes()
+        if key not in registers:
+            half = len(table) // 2
+            lo, hi = expand(table[:half]), expand(table[half:])
+            if hi == lo:
+                registers[key] = lo
+            else:
+                program.append((select(hi, lo), half.bit_length() - 1, hi, lo))
+                registers[key] = len(program) + 1
+        return registers[key]
+
+    return program, expand(np.asarray(rule, dtype=np.uint8))
+
+
+def evaluate(program: Program, output: int, neigh: list[np.ndarray]) -> Bits:
+    regs: list[Bits] = [ZERO, ONES]
+    for op, var, hi, lo in program:
+        x, high, low = neigh[var], regs[hi], regs[lo]
+        if op == "x":
+            regs.append(x)
+        elif op == "not":
+            regs.append(~x)
+        elif op == "and":
+            regs.append(x & high)
+        elif op == "andnot":
+            regs.append(low & ~x)
+        elif op == "or":
+            regs.append(x | low)
+        elif op == "ornot":
+            regs.append(high | ~x)
+        else:
+            regs.append(low ^ (x & (high ^ low)))
+    return regs[output]
+
+
+class CABitPacked(Runner, CARef):
+    """64 cells per uint64 word, with rules evaluated as bit-sliced boolean logic.
+
+    Cell ``i`` is bit ``i % 64`` of word ``1 + i // 64``; words 0 and -1 are ghosts holding the
+    ends of the ring that the neighbourhood wraps around to.
+    """
+
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        self.ncells = ncells
+        self.k = k
+        self.left, self.right = (k - 1) // 2, k // 2
+        assert max(self.left, self.right) < min(WORD, ncells + 1)
+        self.nwords = -(-ncells // WORD)
+        self.words = np.zeros(self.nwords + 2, dtype=np.uint64)
+        self.offsets = [(np.uint64(abs(d)), np.uint64(WORD - abs(d))) for d in range(WORD)]
+        self.programs: dict[bytes, tuple[Program, int]] = {}
+
+        self.cells = init_cells(init, self.ncells)
+
+    @property
+    def cells(self) -> np.ndarray:
+        return unpack(self.words[1:-1], self.ncells)
+
+    @cells.setter
+    def cells(self, cells: Any) -> None:
+        self.words[1:-1] = pack(cells)
+        self.fill_ghosts()
+
+    def packed(self) -> np.ndarray:
+        """The ring as ``np.packbits(cells, bitorder="little")`` would pack it."""
+        row = self.words[1:-1].astype("<u8").view(np.uint8)[: -(-self.ncells // 8)]
+        if self.ncells % 8:
+            row[-1] &= (1 << self.ncells % 8) - 1
+        return row
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k))
+
+    def ring_bits(self, start: int, count: int) -> int:
+        word, offset = divmod(WORD + start, WORD)
+        bits = int(self.words[word]) >> offset
+        if offset + count > WORD:
+            bits |= int(self.words[word + 1]) << (WORD - offset)
+        return bits & ((1 << count) - 1)
+
+    def fill_ghosts(self) -> None:
+        if self.left:
+            self.words[0] = self.ring_bits(self.ncells - self.left, self.left) << (WORD - self.left)
+        if self.right:
+            word, offset = divmod(WORD + self.ncells, WORD)
+            bits = self.ring_bits(0, self.right)
+            low = int(self.words[word]) & ((1 << offset) - 1)
+            self.words[word] = (low | (bits << offset)) & int(ONES)
+            if offset + self.right > WORD:
+                self.words[word + 1] = bits >> (WORD - offset)
+
+    def shifted(self, d: int) -> np.ndarray:
+        """Words whose bit for cell ``i`` holds cell ``i + d``."""
+        w = self.words
+        near, far = self.offsets[abs(d)]
+        if d > 0:
+            return (w[1:-1] >> near) | (w[2:] << far)
+        if d < 0:
+            return (w[1:-1] << near) | (w[:-2] >> far)
+        return w[1:-1]
+
+    def apply_rule(self, rule: np.ndarray) -> "CABitPacked":
+        assert len(rule) == 2**self.k
+        rule = np.asarray(rule, dtype=np.uint8)
+        key = rule.tobytes()
+        if key not in self.programs:
+            self.programs[key] = compile_rule(rule)
+        # bit j of a state id is the cell right - j places away
+        neigh = [self.shifted(self.right - j) for j in range(self.k)]
+        self.words[1:-1] = evaluate(*self.programs[key], neigh)
+        self.fill_ghosts()
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        out[...] = self.apply_rule(rule).cells
+
+
+if __name__ == "__main__":
+    from automata.reference import CAOpt3, test, time
+
+    test(CABitPacked)
+    for ncells, loops in [(250, 10000), (10**4, 10000), (10**6, 1000), (10**8, 10)]:
+        print(f"{ncells} cells")
+        if ncells <= 10**6:
+            time(CAOpt3, loops // 10, ncells)
+        time(CABitPacked, loops, ncells)
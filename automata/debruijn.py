@@ -0,0 +1,164 @@
+from collections import deque
+from functools import cached_property
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+
+
+class DeBruijn:
+    """The de Bruijn graph of a ``make_rule`` table: nodes are the ``2**(k - 1)`` words of
+    ``k - 1`` cells, and every window ``w`` of ``k`` cells is an edge from its first ``k - 1``
+    cells to its last ``k - 1``, labelled ``rule[w]``.
+
+    Preimages of a ring of ``n`` cells are exactly the closed walks of length ``n`` whose labels
+    spell it, so they are counted as the trace of a product of transfer matrices and enumerated
+    as walks, and a pattern has no preimage at all when no walk spells it.
+    """
+
+    def __init__(self, rule: Sequence[int]) -> None:
+        self.rule = np.asarray(rule, dtype=np.uint8)
+        self.k = len(self.rule).bit_length() - 1
+        assert len(self.rule) == 2**self.k
+        self.left = (self.k - 1) // 2
+        self.nnodes = 2 ** (self.k - 1)
+        nodes = np.arange(self.nnodes)
+        # node v is entered from the nodes at the front of the windows (b << (k - 1)) | v
+        self.windows = [(b << (self.k - 1)) | nodes for b in (0, 1)]
+        self.sources = [w >> 1 for w in self.windows]
+
+    def advance(self, counts: np.ndarray, cell: int) -> np.ndarray:
+        """Walks extended by one edge labelled ``cell``, counted by the node they end on."""
+        out = np.zeros_like(counts)
+        for windows, sources in zip(self.windows, self.sources):
+            labelled = self.rule[windows] == cell
+            out[..., labelled] += counts[..., sources[labelled]]
+        return out
+
+    @cached_property
+    def transfer(self) -> np.ndarray:
+        """``transfer[cell][u, v]``: the edges from ``u`` to ``v`` labelled ``cell``, which is at
+        most 1 except for ``k = 1``, where the only node has two loops."""
+        matrices = np.zeros((2, self.nnodes, self.nnodes), dtype=np.int64)
+        for windows, sources in zip(self.windows, self.sources):
+            np.add.at(matrices, (self.rule[windows], sources, windows & (self.nnodes - 1)), 1)
+        return matrices
+
+    @cached_property
+    def blocks(self) -> tuple[int, np.ndarray]:
+        """``(g, table)`` with ``table[word]`` the transfer matrix of the ``g`` cells of ``word``,
+        the first cell being its most significant bit, for the largest ``g`` up to 16 whose table
+        stays under about 2**20 entries."""
+        table, g = self.transfer, 1
+        while 2 * g <= 16 and 2 ** (2 * g) * self.nnodes**2 <= 2**20:
+            table = np.matmul(table[:, None], table[None, :]).reshape(-1, self.nnodes, self.nnodes)
+            g *= 2
+        return g, table
+
+    def count_preimages(self, config: Any, cyclic: bool = True) -> int:
+        """Preimages of ``config`` as a ring (the trace of the product of its transfer matrices),
+        or with ``cyclic=False`` as a finite pattern whose ``k - 1`` extra cells are free.
+
+        The product is taken ``g`` cells at a time from ``blocks``, in int64 while it can't
+        overflow and in Python ints after that, so counts are exact.
+        """
+        g, table = self.blocks
+        cells = np.asarray(config, dtype=np.int64)
+        nwords = len(cells) // g
+        words = cells[: nwords * g].reshape(nwords, g) @ (1 << np.arange(g - 1, -1, -1))
+        matrices = [table[w] for w in words] + [self.transfer[c] for c in cells[nwords * g :]]
+        if cyclic:
+            counts = np.eye(self.nnodes, dtype=np.int64)
+        else:
+            counts = np.ones((1, self.nnodes), dtype=np.int64)
+        # no entry grows by more than the largest column sum of the matrices it is multiplied by
+        growth = max(int(m.sum(axis=1).max(initial=1)) for m in (table, self.transfer))
+        for matrix in matrices:
+            if counts.dtype != object and counts.max() > 2**62 // growth:
+                counts = counts.astype(object)
+            counts = counts @ matrix.astype(counts.dtype)
+        return int(np.trace(counts) if cyclic else counts.sum())
+
+    def reachable(self, config: Any, start: int) -> np.ndarray:
+        """``ok[i, u]``: some walk from node ``u`` spells ``config[i:]`` and ends on ``start``."""
+        n = len(config)
+        ok = np.zeros((n + 1, self.nnodes), dtype=bool)
+        ok[n, start] = True
+        mask = self.nnodes - 1
+        for i in range(n - 1, -1, -1):
+            for b in (0, 1):
+                windows = (np.arange(self.nnodes) << 1) | b
+                ok[i] |= (self.rule[windows] == config[i]) & ok[i + 1, windows & mask]
+        return ok
+
+    def preimages(self, config: Any) -> Iterator[np.ndarray]:
+        """Every preimage of the ring ``config``, one at a time: for each start node the walks
+        are searched depth first, pruned by ``reachable`` so that no branch is a dead end."""
+        n, mask = len(config), self.nnodes - 1
+        for start in range(self.nnodes):
+            ok = self.reachable(config, start)
+            if not ok[0, start]:
+                continue
+            windows = np.zeros(n, dtype=np.int64)
+            stack = [(0, start, 1), (0, start, 0)]
+            while stack:
+                i, node, b = stack.pop()
+                w = (node << 1) | b
+                if self.rule[w] != config[i] or not ok[i + 1, w & mask]:
+                    continue
+                windows[i] = w
+                if i + 1 == n:
+                    # window i starts at cell i - left
+                    yield np.roll(windows >> (self.k - 1), -self.left).astype(np.uint8)
+                else:
+                    stack += [(i + 1, w & mask, 1), (i + 1, w & mask, 0)]
+
+    def shortest_orphan(self) -> Optional[list[int]]:
+        """A shortest pattern without any preimage, found by breadth-first search over the sets
+        of nodes a walk spelling a pattern can end on, or None if the rule is surjective."""
+        start = (1 << self.nnodes) - 1
+        parents: dict[int, tuple[int, int]] = {start: (start, -1)}
+        queue = deque([start])
+        while queue:
+            nodes = queue.popleft()
+            members = np.array([(nodes >> u) & 1 for u in range(self.nnodes)], dtype=np.int64)
+            for cell in (0, 1):
+                reached = self.advance(members, cell)
+                subset = int(np.sum(1 << np.flatnonzero(reached)))
+                if subset in parents:
+                    continue
+                parents[subset] = (nodes, cell)
+                if subset == 0:
+                    pattern = []
+                    while subset != start:
+                        subset, cell = parents[subset]
+                        pattern.append(cell)
+                    return pattern[::-1]
+                queue.append(subset)
+        return None
+
+    def garden_of_eden(self, ncells: int) -> Optional[np.ndarray]:
+        """A ring of ``ncells`` without preimages, made by padding the shortest orphan with 0s."""
+        orphan = self.shortest_orphan()
+        if orphan is None or len(orphan) > ncells:
+            return None
+        config = np.zeros(ncells, dtype=np.uint8)
+        config[: len(orphan)] = orphan
+        return config
+
+
+if __name__ == "__main__":
+    from timeit import default_timer
+
+    from automata.reference import CARef
+
+    for rule_id in (30, 90, 110, 184):
+        graph = DeBruijn(CARef.make_rule(rule_id, 3))
+        orphan = graph.shortest_orphan()
+        config = np.random.randint(0, 2, size=10**4)
+        start = default_timer()
+        count = graph.count_preimages(config)
+        elapsed = default_timer() - start
+        print(
+            f"rule {rule_id}: shortest orphan {orphan}, "
+            f"{count} preimages of a random ring of 10^4 cells ({elapsed * 1e3:.1f} ms)"
+        )
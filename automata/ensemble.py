@@ -0,0 +1,87 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+
+
+def make_rules(rule_ids: Any, k: int) -> np.ndarray:
+    """The ``make_rule`` tables of many rules at once, one row per rule id."""
+    rule_ids = np.asarray(rule_ids)
+    if 2**k < 63:
+        rules: np.ndarray = (rule_ids.astype(np.int64)[:, None] >> np.arange(2**k)) & 1
+        return rules.astype(np.uint8)
+    return np.array([CARef.make_rule(int(r), k) for r in rule_ids], dtype=np.uint8)
+
+
+class Ensemble:
+    """Many automata with the same ``ncells`` and ``k``, each with its own rule, stepped together.
+
+    Member ``r`` follows ``rule_ids[r]`` from ``cells[r]``; ``init`` is ``'center'``,
+    ``'random'`` or an ``(R, ncells)`` array.
+    """
+
+    def __init__(
+        self,
+        rule_ids: Any,
+        ncells: int,
+        k: int,
+        init: Any = "center",
+        rng: Optional[np.random.Generator] = None,
+    ) -> None:
+        self.rule_ids = np.asarray(rule_ids)
+        self.ncells = ncells
+        self.k = k
+        self.left, self.right = (k - 1) // 2, k // 2
+        self.rules = make_rules(self.rule_ids, k)
+        nmembers = len(self.rule_ids)
+
+        self.cells = init_cells(init, ncells, batch=nmembers, rng=rng or np.random.default_rng())
+
+        local_dtype = np.min_scalar_type(2**k - 1)
+        self.padded = np.empty((nmembers, ncells + k - 1), dtype=np.uint8)
+        self.local = np.empty((nmembers, ncells), dtype=local_dtype)
+        self.scratch = np.empty((nmembers, ncells), dtype=local_dtype)
+        id_dtype = np.min_scalar_type(nmembers * 2**k)
+        self.ids = np.empty((nmembers, ncells), dtype=id_dtype)
+        # row r of the flattened rule table starts at r * 2**k
+        self.offsets = (np.arange(nmembers, dtype=id_dtype) * 2**k)[:, None]
+
+    @classmethod
+    def grid(
+        cls, rule_ids: Any, ncells: int, k: int, nseeds: int, seed: Optional[int] = None
+    ) -> "Ensemble":
+        """Every rule against the same ``nseeds`` random initial states, rule-major."""
+        rule_ids = np.asarray(rule_ids)
+        rng = np.random.default_rng(seed)
+        inits = rng.integers(0, 2, size=(nseeds, ncells), dtype=np.uint8)
+        return cls(
+            np.repeat(rule_ids, nseeds), ncells, k, np.tile(inits, (len(rule_ids), 1))
+        )
+
+    def state_ids(self) -> np.ndarray:
+        n, left = self.ncells, self.left
+        self.padded[:, :left] = self.cells[:, n - left :]
+        self.padded[:, left : left + n] = self.cells
+        self.padded[:, left + n :] = self.cells[:, : self.right]
+        self.local[...] = 0
+        for j in range(self.k):
+            start = left + self.right - j
+            np.left_shift(
+                self.padded[:, start : start + n], j, out=self.scratch, dtype=self.scratch.dtype
+            )
+            self.local |= self.scratch
+        ids: np.ndarray = np.add(self.local, self.offsets, out=self.ids)
+        return ids
+
+    def advance(self, steps: int = 1) -> "Ensemble":
+        flat_rules = self.rules.ravel()
+        for _ in range(steps):
+            np.take(flat_rules, self.state_ids(), out=self.cells)
+        return self
+
+    def subset(self, rows: Any) -> "Ensemble":
+        return Ensemble(self.rule_ids[rows], self.ncells, self.k, self.cells[rows])
+
+    def member(self, r: int) -> tuple[int, np.ndarray]:
+        return int(self.rule_ids[r]), self.cells[r]
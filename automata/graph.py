@@ -0,0 +1,89 @@
+from typing import Any, Iterator
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+
+
+def index_dtype(n: int) -> Any:
+    return np.int32 if n < 2**31 else np.int64
+
+
+def ring_graph(ncells: int, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """CSR of the ring used by ``CARef``, neighbours in the order they make up a state id."""
+    left, right = (k - 1) // 2, k // 2
+    dtype = index_dtype(ncells * k)
+    indptr = np.arange(0, ncells * k + 1, k, dtype=dtype)
+    indices = (np.arange(ncells)[:, None] + np.arange(-left, right + 1)) % ncells
+    return indptr, indices.ravel().astype(index_dtype(ncells))
+
+
+class CAGraph:
+    """Automaton on an arbitrary graph in CSR form, node ``i`` seeing
+    ``indices[indptr[i]:indptr[i + 1]]``.
+
+    Nodes are updated in blocks of ``block`` nodes, so the scratch memory of a step is bounded by
+    the edges of one block rather than the whole graph. Three kinds of rules are supported:
+    ``apply_rule`` looks up a ``make_rule`` table with the ordered neighbourhood as the state id,
+    ``apply_totalistic`` looks up ``table[sum of neighbours]`` and ``apply_outer_totalistic``
+    ``table[own state, sum of neighbours]``.
+    """
+
+    def __init__(
+        self, indptr: Any, indices: Any, init: Any = "center", block: int = 2**16
+    ) -> None:
+        self.indptr = np.asarray(indptr)
+        self.indptr = self.indptr.astype(index_dtype(int(self.indptr[-1])), copy=False)
+        self.ncells = len(self.indptr) - 1
+        self.indices = np.asarray(indices).astype(index_dtype(self.ncells), copy=False)
+        self.block = block
+        self.max_degree = int(np.diff(self.indptr).max(initial=0))
+
+        self.cells = init_cells(init, self.ncells)
+
+    make_rule = staticmethod(CARef.make_rule)
+
+    def blocks(self) -> Iterator[tuple[int, int, np.ndarray, np.ndarray]]:
+        """For each block of nodes ``[a, b)``: its local indptr and its neighbours' states."""
+        for a in range(0, self.ncells, self.block):
+            b = min(a + self.block, self.ncells)
+            indptr = self.indptr[a : b + 1] - self.indptr[a]
+            yield a, b, indptr, self.cells[self.indices[self.indptr[a] : self.indptr[b]]]
+
+    @staticmethod
+    def segment_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+        totals = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(values, out=totals[1:])
+        sums: np.ndarray = totals[indptr[1:]] - totals[indptr[:-1]]
+        return sums
+
+    def neighbour_sums(self) -> np.ndarray:
+        sums = np.empty(self.ncells, dtype=np.min_scalar_type(self.max_degree))
+        for a, b, indptr, states in self.blocks():
+            sums[a:b] = self.segment_sums(states, indptr)
+        return sums
+
+    def state_ids(self) -> np.ndarray:
+        assert self.max_degree < 63
+        ids = np.empty(self.ncells, dtype=np.min_scalar_type(2**self.max_degree - 1))
+        for a, b, indptr, states in self.blocks():
+            # the first neighbour is the most significant bit of its node's id
+            shifts = np.repeat(indptr[1:], np.diff(indptr)) - 1 - np.arange(indptr[-1])
+            ids[a:b] = self.segment_sums(states.astype(np.int64) << shifts, indptr)
+        return ids
+
+    def apply_rule(self, rule: Any) -> "CAGraph":
+        assert len(rule) >= 2**self.max_degree
+        self.cells = np.asarray(rule, dtype=np.uint8)[self.state_ids()]
+        return self
+
+    def apply_totalistic(self, table: Any) -> "CAGraph":
+        assert len(table) > self.max_degree
+        self.cells = np.asarray(table, dtype=np.uint8)[self.neighbour_sums()]
+        return self
+
+    def apply_outer_totalistic(self, table: Any) -> "CAGraph":
+        table = np.asarray(table, dtype=np.uint8)
+        assert table.shape[0] == 2 and table.shape[1] > self.max_degree
+        self.cells = table[self.cells, self.neighbour_sums()]
+        return self
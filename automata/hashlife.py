@@ -0,0 +1,249 @@
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+
+
+class Node:
+    __slots__ = ("level", "left", "right")
+
+    def __init__(self, level: int, left: Optional["Node"], right: Optional["Node"]) -> None:
+        self.level = level
+        self.left = left
+        self.right = right
+
+
+OFF, ON = Node(0, None, None), Node(0, None, None)
+
+
+class NodeLimit(Exception):
+    pass
+
+
+class CAHashLife(CARef):
+    """HashLife for 1D rings: hash-consed binary trees with memoised power-of-two jumps.
+
+    A level ``n`` node holds ``2**n`` cells, and its centre half can be advanced
+    ``2**(n - 2 - s)`` generations without looking outside it, where ``2**s`` is at least the
+    neighbourhood radius (``s = 0`` for ``k = 3``). Each jump tiles the ring into a node whose
+    centre half starts at cell 0 and holds the whole ring, so ``ncells`` may be anything: the
+    first ``ncells`` cells of the advanced centre half are the new ring. Jumps are cheap as long
+    as the spacetime repeats (always for a power-of-two ring). Results are kept in an LRU cache
+    of at most ``max_results`` entries and the node table never holds more than ``max_nodes``:
+    it is rebuilt from live nodes between jumps once half full, and ``advance`` halves any jump
+    that would overflow it.
+    """
+
+    def __init__(
+        self,
+        ncells: int,
+        k: int,
+        init: Any = "center",
+        max_results: int = 2**20,
+        max_nodes: int = 2**22,
+    ) -> None:
+        assert ncells >= k
+        self.ncells = ncells
+        self.k = k
+        self.left_radius, self.right_radius = (k - 1) // 2, k // 2
+        self.s = max(self.right_radius - 1, 0).bit_length()
+        self.base = self.s + 2
+        # the smallest level whose centre half holds the whole ring
+        self.period_level = max(ncells - 1, 0).bit_length() + 1
+        self.max_results = max_results
+        self.max_nodes = max_nodes
+        self.nodes: dict[tuple[Node, Node], Node] = {}
+        self.results: OrderedDict[tuple[Node, int], Node] = OrderedDict()
+        self.rule_key: Optional[bytes] = None
+        self.rule = np.zeros(2**k, dtype=np.uint8)
+        self.generation = 0
+
+        self.cells = init_cells(init, ncells)
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k))
+
+    def cons(self, left: Node, right: Node) -> Node:
+        node = self.nodes.get((left, right))
+        if node is None:
+            if len(self.nodes) >= self.max_nodes:
+                raise NodeLimit()
+            node = self.nodes[left, right] = Node(left.level + 1, left, right)
+        return node
+
+    def from_cells(self, cells: Iterable[int]) -> Node:
+        nodes = [ON if c else OFF for c in cells]
+        while len(nodes) > 1:
+            nodes = [self.cons(a, b) for a, b in zip(nodes[::2], nodes[1::2])]
+        return nodes[0]
+
+    def write_cells(self, node: Node, out: np.ndarray, offset: int, start: int, stop: int) -> None:
+        """Copy the cells of ``node`` (placed at ``offset``) that fall in ``[start, stop)``."""
+        size = 1 << node.level
+        if offset >= stop or offset + size <= start:
+            return
+        if node.level == 0:
+            out[offset - start] = node is ON
+            return
+        assert node.left is not None and node.right is not None
+        self.write_cells(node.left, out, offset, start, stop)
+        self.write_cells(node.right, out, offset + size // 2, start, stop)
+
+    @property
+    def cells(self) -> np.ndarray:
+        return self.ring.copy()
+
+    @cells.setter
+    def cells(self, cells: Any) -> None:
+        self.ring = np.array(cells, dtype=np.uint8)
+
+    def window(self, start: int, stop: int) -> np.ndarray:
+        """Cells ``start`` to ``stop`` of the ring, wrapping around as often as needed."""
+        return self.ring[np.arange(start, stop) % self.ncells]
+
+    def tile(self, level: int) -> Node:
+        """A level ``level`` node of the ring repeated, cell ``i`` of it being ring cell
+        ``i - 2**(level - 2)``, so that its centre half starts at cell 0.
+
+        Nodes are built top-down by the ring offset they start at, so each distinct one is built
+        once: for a power-of-two ring every node above its size is the same, for other sizes
+        there are at most ``ncells`` per level.
+        """
+        n = self.ncells
+        built: dict[tuple[int, int], Node] = {}
+
+        def build(level: int, start: int) -> Node:
+            if level == 0:
+                return ON if self.ring[start] else OFF
+            node = built.get((level, start))
+            if node is None:
+                half = 1 << (level - 1)
+                left, right = build(level - 1, start), build(level - 1, (start + half) % n)
+                node = built[level, start] = self.cons(left, right)
+            return node
+
+        return build(level, -(1 << (level - 2)) % n)
+
+    def set_rule(self, rule: np.ndarray) -> None:
+        assert len(rule) == 2**self.k
+        key = np.asarray(rule, dtype=np.uint8).tobytes()
+        if key != self.rule_key:
+            self.rule_key = key
+            self.rule = np.asarray(rule, dtype=np.uint8)
+            self.results.clear()
+
+    def step_base(self, node: Node) -> Node:
+        size = 1 << node.level
+        cells = self.window_of(node)
+        base = 1 << np.arange(self.k)[::-1]
+        new = [
+            self.rule[int(cells[i - self.left_radius : i + self.right_radius + 1] @ base)]
+            for i in range(size // 4, 3 * size // 4)
+        ]
+        return self.from_cells(new)
+
+    def window_of(self, node: Node) -> np.ndarray:
+        out = np.empty(1 << node.level, dtype=np.int64)
+        self.write_cells(node, out, 0, 0, len(out))
+        return out
+
+    def centre(self, node: Node) -> Node:
+        left, right = node.left, node.right
+        assert left is not None and right is not None
+        assert left.right is not None and right.left is not None
+        return self.cons(left.right, right.left)
+
+    def result(self, node: Node, j: int) -> Node:
+        """Centre half of ``node`` after ``2**j`` generations."""
+        key = (node, j)
+        res = self.results.get(key)
+        if res is not None:
+            self.results.move_to_end(key)
+            return res
+
+        if node.level == self.base:
+            res = self.step_base(node)
+        else:
+            left, right = node.left, node.right
+            assert left is not None and right is not None
+            q0, q1, q2, q3 = left.left, left.right, right.left, right.right
+            assert q0 is not None and q1 is not None and q2 is not None and q3 is not None
+            a, b, c = self.cons(q0, q1), self.cons(q1, q2), self.cons(q2, q3)
+            if j == node.level - 2 - self.s:
+                a, b, c = self.result(a, j - 1), self.result(b, j - 1), self.result(c, j - 1)
+                j -= 1
+            else:
+                a, b, c = self.centre(a), self.centre(b), self.centre(c)
+            res = self.cons(self.result(self.cons(a, b), j), self.result(self.cons(b, c), j))
+
+        self.results[key] = res
+        if len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+        return res
+
+    def jump(self, j: int) -> None:
+        node = self.result(self.tile(max(self.period_level, j + 2 + self.s)), j)
+        ring = np.empty(self.ncells, dtype=np.uint8)
+        self.write_cells(node, ring, 0, 0, self.ncells)
+        self.ring = ring
+
+    def collect(self) -> None:
+        nodes: dict[tuple[Node, Node], Node] = {}
+        stack = [*(n for n, _ in self.results), *self.results.values()]
+        while stack:
+            node = stack.pop()
+            if node.level and (node.left, node.right) not in nodes:
+                assert node.left is not None and node.right is not None
+                nodes[node.left, node.right] = node
+                stack += [node.left, node.right]
+        self.nodes = nodes
+
+    def forget(self) -> None:
+        """Make room for the next jump: keep the nodes of cached results if they take at most half
+        of ``max_nodes``, else drop the results too (the ring itself is a plain row)."""
+        self.collect()
+        if len(self.nodes) > self.max_nodes // 2:
+            self.results.clear()
+            self.nodes = {}
+
+    def step_plain(self) -> None:
+        ids = np.zeros(self.ncells, dtype=np.int64)
+        for d in range(-self.left_radius, self.right_radius + 1):
+            ids = ids << 1 | np.roll(self.ring, -d)
+        self.ring = self.rule[ids]
+
+    def advance(self, rule: np.ndarray, steps: int) -> "CAHashLife":
+        """Advance by the largest power-of-two jumps that fit in what is left of ``steps``.
+
+        A jump that would grow the node table past ``max_nodes`` is abandoned and halved, which
+        happens when the spacetime doesn't repeat (a ring whose size isn't a power of two can
+        take a very long time to), and once even one generation doesn't fit the rest are stepped
+        plainly, so memory stays bounded either way.
+        """
+        self.set_rule(rule)
+        done, j = 0, steps.bit_length()
+        while done < steps:
+            while j >= 0 and 1 << j > steps - done:
+                j -= 1
+            if len(self.nodes) > self.max_nodes // 2:
+                self.forget()
+            if j < 0:
+                self.step_plain()
+                done += 1
+                continue
+            try:
+                self.jump(j)
+            except NodeLimit:
+                self.results.clear()
+                self.nodes = {}
+                j -= 1
+                continue
+            done += 1 << j
+        self.generation += steps
+        return self
+
+    def apply_rule(self, rule: np.ndarray) -> "CAHashLife":
+        return self.advance(rule, 1)
@@ -0,0 +1,162 @@
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+
+class HistoryStore:
+    """Spacetime history on disk, one bit per cell, in chunks of ``chunk_rows`` generations.
+
+    ``path`` is a directory holding ``meta.json``, the chunks in ``data.bin`` (each optionally
+    zlib-compressed) and ``index.bin`` with the ``(offset, length)`` of every chunk, so any
+    generation is found without scanning. Generations that don't fill a chunk yet are kept in
+    memory; ``flush`` writes them as a short last chunk, which is replaced as it fills up and
+    picked up again when the store is reopened, so that a run can be resumed from it.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.ncells: int = self.meta["ncells"]
+        self.chunk_rows: int = self.meta["chunk_rows"]
+        self.compress: int = self.meta["compress"]
+        self.rowbytes = -(-self.ncells // 8)
+        self.index = np.fromfile(self.path / "index.bin", dtype="<u8").reshape(-1, 2).tolist()
+        self.buffer = np.zeros((self.chunk_rows, self.rowbytes), dtype=np.uint8)
+        self.pending = 0
+        self.tail: Optional[int] = None
+        self.cached: Optional[tuple[int, np.ndarray]] = None
+
+        if self.index:
+            last = self.chunk(len(self.index) - 1)
+            if len(last) < self.chunk_rows:
+                self.pending = len(last)
+                self.buffer[: self.pending] = last
+                self.tail = self.index[-1][0]
+
+    @classmethod
+    def create(
+        cls,
+        path: Union[str, Path],
+        ncells: int,
+        chunk_rows: int = 1024,
+        compress: int = 0,
+        **attrs: Any,
+    ) -> "HistoryStore":
+        """New empty store; ``compress`` is a zlib level, 0 for raw bits, and ``attrs`` (the rule
+        id and ``k``, say) are kept in ``meta.json``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        meta = {"ncells": ncells, "chunk_rows": chunk_rows, "compress": compress, "attrs": attrs}
+        (path / "meta.json").write_text(json.dumps(meta, indent=4))
+        (path / "data.bin").write_bytes(b"")
+        (path / "index.bin").write_bytes(b"")
+        return cls(path)
+
+    @property
+    def attrs(self) -> dict[str, Any]:
+        attrs: dict[str, Any] = self.meta["attrs"]
+        return attrs
+
+    def __len__(self) -> int:
+        full = len(self.index) - (self.tail is not None)
+        return full * self.chunk_rows + self.pending
+
+    def write_chunk(self, rows: np.ndarray) -> None:
+        if self.tail is not None:
+            self.index.pop()
+            with open(self.path / "data.bin", "r+b") as f:
+                f.truncate(self.tail)
+            with open(self.path / "index.bin", "r+b") as f:
+                f.truncate(len(self.index) * 16)
+            self.tail = None
+            self.cached = None
+
+        data = rows.tobytes()
+        if self.compress:
+            data = zlib.compress(data, self.compress)
+        with open(self.path / "data.bin", "ab") as f:
+            offset = f.tell()
+            f.write(data)
+        with open(self.path / "index.bin", "ab") as f:
+            f.write(np.array([offset, len(data)], dtype="<u8").tobytes())
+        self.index.append([offset, len(data)])
+
+    def append_packed(self, row: np.ndarray) -> None:
+        self.buffer[self.pending] = row
+        self.pending += 1
+        if self.pending == self.chunk_rows:
+            self.write_chunk(self.buffer)
+            self.pending = 0
+
+    def append(self, cells: Any) -> None:
+        self.append_packed(np.packbits(np.asarray(cells, dtype=np.uint8), bitorder="little"))
+
+    def flush(self) -> None:
+        if self.pending:
+            self.write_chunk(self.buffer[: self.pending])
+            self.tail = self.index[-1][0]
+
+    def read(self, offset: int, length: int) -> bytes:
+        with open(self.path / "data.bin", "rb") as f:
+            return os.pread(f.fileno(), length, offset)
+
+    def chunk(self, c: int) -> np.ndarray:
+        if self.cached is None or self.cached[0] != c:
+            data = self.read(*self.index[c])
+            if self.compress:
+                data = zlib.decompress(data)
+            rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, self.rowbytes)
+            self.cached = (c, rows)
+        return self.cached[1]
+
+    def packed_rows(self, start: int, stop: int) -> np.ndarray:
+        out = np.empty((stop - start, self.rowbytes), dtype=np.uint8)
+        t = start
+        while t < stop:
+            c, r = divmod(t, self.chunk_rows)
+            n = min(stop - t, self.chunk_rows - r)
+            if c == len(self) // self.chunk_rows:
+                block = self.buffer[r : r + n]
+            elif self.compress:
+                block = self.chunk(c)[r : r + n]
+            else:
+                data = self.read(self.index[c][0] + r * self.rowbytes, n * self.rowbytes)
+                block = np.frombuffer(data, dtype=np.uint8).reshape(n, self.rowbytes)
+            out[t - start : t - start + n] = block
+            t += n
+        return out
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        assert 0 <= start <= stop <= len(self)
+        packed = self.packed_rows(start, stop)
+        return np.unpackbits(packed, axis=1, count=self.ncells, bitorder="little")
+
+    def __getitem__(self, t: int) -> np.ndarray:
+        if t < 0:
+            t += len(self)
+        if not 0 <= t < len(self):
+            raise IndexError(t)
+        row: np.ndarray = self.rows(t, t + 1)[0]
+        return row
+
+
+def record(store: HistoryStore, ca: Any, rule: Any, steps: int) -> HistoryStore:
+    """Append ``steps`` generations of ``ca`` to ``store`` (and its current state, if the store
+    is empty), then flush so the run can be resumed from the last stored generation."""
+    append = store.append_packed if hasattr(ca, "packed") else store.append
+    state = ca.packed if hasattr(ca, "packed") else lambda: ca.cells
+    if not len(store):
+        append(state())
+    for _ in range(steps):
+        ca.apply_rule(rule)
+        append(state())
+    store.flush()
+    return store
+
+
+def resume(store: HistoryStore, CAutomaton: Any, k: int) -> Any:
+    return CAutomaton(store.ncells, k, init=store[-1])
@@ -0,0 +1,143 @@
+import re
+from timeit import default_timer
+from typing import Any
+
+import numpy as np
+
+from automata.bitpacked import WORD, Program, compile_rule, evaluate
+from automata.reference import init_cells
+
+Planes = tuple[np.ndarray, np.ndarray]
+
+
+def make_rule(rule: str) -> np.ndarray:
+    """``(2, 9)`` outer-totalistic table of a ``B.../S...`` rule string such as ``"B3/S23"``:
+    ``table[own state, live neighbours]``."""
+    match = re.fullmatch(r"B([0-8]*)/S([0-8]*)", rule.strip(), re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"not a B/S rule: {rule!r}")
+    table = np.zeros((2, 9), dtype=np.uint8)
+    for own, counts in enumerate(match.groups()):
+        table[own, [int(c) for c in counts]] = 1
+    return table
+
+
+def full_add(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Planes:
+    axb = a ^ b
+    return axb ^ c, (a & b) | (c & axb)
+
+
+def half_add(a: np.ndarray, b: np.ndarray) -> Planes:
+    return a ^ b, a & b
+
+
+class CALife:
+    """Outer-totalistic automaton on a ``rows × cols`` torus, 64 cells of a row per uint64 word.
+
+    Cell ``(y, x)`` is bit ``x % 64`` of ``words[y, x // 64]``. The west and east neighbours of a
+    whole row are its words shifted by one bit with the carry from the next word, the north and
+    south ones are the rows above and below, and the eight of them are summed into four bit planes
+    with full and half adders, 64 cells per operation. The rule, a ``make_rule`` table, is then
+    compiled by ``compile_rule`` over the bits ``(own, count)``.
+    """
+
+    def __init__(self, rows: int, cols: int, init: Any = "center") -> None:
+        assert cols % WORD == 0, "each row must be a whole number of words"
+        self.rows, self.cols = rows, cols
+        self.programs: dict[bytes, tuple[Program, int]] = {}
+
+        self.cells = init_cells(init, (rows, cols))
+
+    make_rule = staticmethod(make_rule)
+
+    @property
+    def cells(self) -> np.ndarray:
+        return np.unpackbits(self.words.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+
+    @cells.setter
+    def cells(self, cells: Any) -> None:
+        packed = np.packbits(np.asarray(cells, dtype=np.uint8), axis=1, bitorder="little")
+        self.words = packed.view("<u8").astype(np.uint64)
+
+    def program(self, table: Any) -> tuple[Program, int]:
+        table = np.asarray(table, dtype=np.uint8)
+        key = table.tobytes()
+        if key not in self.programs:
+            # indexed by own << 4 | count, counts 9 to 15 never occur
+            full = np.zeros((2, 16), dtype=np.uint8)
+            full[:, : table.shape[1]] = table
+            self.programs[key] = compile_rule(full.ravel())
+        return self.programs[key]
+
+    def horizontal(self, w: np.ndarray) -> Planes:
+        one, carry = np.uint64(1), np.uint64(WORD - 1)
+        west = (w << one) | (np.roll(w, 1, axis=1) >> carry)
+        east = (w >> one) | (np.roll(w, -1, axis=1) << carry)
+        return west, east
+
+    def counts(self) -> list[np.ndarray]:
+        """Live neighbours of every cell as bit planes, least significant first."""
+        w = self.words
+        west, east = self.horizontal(w)
+        # the three cells of each row summed, and the two beside each cell
+        row_ones, row_twos = full_add(west, w, east)
+        side_ones, side_twos = half_add(west, east)
+        up_ones, down_ones = np.roll(row_ones, 1, axis=0), np.roll(row_ones, -1, axis=0)
+        up_twos, down_twos = np.roll(row_twos, 1, axis=0), np.roll(row_twos, -1, axis=0)
+        ones, carry = full_add(up_ones, down_ones, side_ones)
+        twos, fours_a = full_add(up_twos, down_twos, side_twos)
+        twos, fours_b = half_add(twos, carry)
+        fours, eights = half_add(fours_a, fours_b)
+        return [ones, twos, fours, eights]
+
+    def apply_rule(self, table: Any) -> "CALife":
+        program, output = self.program(table)
+        new = evaluate(program, output, [*self.counts(), self.words])
+        self.words = new if isinstance(new, np.ndarray) else np.full_like(self.words, new)
+        return self
+
+
+def step_roll(cells: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """The same step on a uint8 grid, summing eight ``np.roll``s."""
+    counts = sum(
+        np.roll(cells, (dy, dx), axis=(0, 1))
+        for dy in (-1, 0, 1)
+        for dx in (-1, 0, 1)
+        if dy or dx
+    )
+    new: np.ndarray = table[cells, counts]
+    return new
+
+
+def throughput(size: int = 8192, steps: int = 10, rule: str = "B3/S23") -> None:
+    """Print cell updates per second of ``CALife`` and of ``step_roll`` on a ``size²`` torus."""
+    table = make_rule(rule)
+    ca = CALife(size, size, init="random")
+    start = default_timer()
+    for _ in range(steps):
+        ca.apply_rule(table)
+    packed = size**2 * steps / (default_timer() - start)
+
+    cells = np.random.randint(0, 2, size=(size, size)).astype(np.uint8)
+    start = default_timer()
+    for _ in range(max(steps // 5, 1)):
+        cells = step_roll(cells, table)
+    rolled = size**2 * max(steps // 5, 1) / (default_timer() - start)
+    print(f"{size}x{size}: bit-packed {packed:.2e} cells/s, np.roll {rolled:.2e} cells/s")
+
+
+def test(rows: int = 64, cols: int = 128, niter: int = 50) -> None:
+    for rule in ("B3/S23", "B36/S23", "B2/S", "B1357/S1357", "B012345678/S012345678"):
+        table = make_rule(rule)
+        ca = CALife(rows, cols, init="random")
+        cells = ca.cells
+        for _ in range(niter):
+            ca.apply_rule(table)
+            cells = step_roll(cells, table)
+            assert (ca.cells == cells).all(), rule
+    print("All tests passed.")
+
+
+if __name__ == "__main__":
+    test()
+    throughput()
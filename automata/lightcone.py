@@ -0,0 +1,107 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+from automata.runner import Runner
+
+
+class CALightCone(Runner, CARef):
+    """Updates only the cells that may differ from a uniform background.
+
+    The ring is kept as ``diff = cells ^ background`` together with the interval ``[lo, hi)``
+    (modulo ``ncells``) outside of which ``diff`` is 0. The background follows the rule on its own
+    (so rules with ``rule[0] == 1`` are fine) and a step only recomputes the interval widened by
+    ``k // 2`` cells either side, then trims it to the cells that actually differ. Once the
+    interval would cover the ring every cell is updated instead, until the differing cells fit in
+    half of it again.
+    """
+
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        self.ncells = ncells
+        self.k = k
+        self.left, self.right = (k - 1) // 2, k // 2
+        self.background = 0
+        self.active: Optional[tuple[int, int]] = None
+
+        self.cells = init_cells(init, self.ncells)
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k), dtype=np.uint8)
+
+    @property
+    def cells(self) -> np.ndarray:
+        return self.diff ^ np.uint8(self.background)
+
+    @cells.setter
+    def cells(self, cells: Any) -> None:
+        self.diff = np.array(cells, dtype=np.uint8) ^ np.uint8(self.background)
+        self.active = None
+        self.trim(0, self.ncells)
+
+    def trim(self, lo: int, hi: int) -> None:
+        """Shrink the interval ``[lo, hi)`` to the cells of it that differ from the background."""
+        n = self.ncells
+        if hi - lo >= n:
+            changed = np.flatnonzero(self.diff)
+            if len(changed) == 0:
+                self.active = (0, 0)
+            elif changed[-1] + 1 - changed[0] <= n // 2:
+                self.active = (int(changed[0]), int(changed[-1]) + 1)
+            else:
+                self.active = None
+            return
+        changed = np.flatnonzero(self.diff[np.arange(lo, hi) % n])
+        if len(changed) == 0:
+            self.active = (0, 0)
+            return
+        first, last = int(changed[0]), int(changed[-1])
+        start = (lo + first) % n
+        self.active = (start, start + last - first + 1)
+
+    def window_ids(self, padded: np.ndarray) -> np.ndarray:
+        width = len(padded) - self.k + 1
+        dtype = np.min_scalar_type(2**self.k - 1)
+        ids = np.zeros(width, dtype=dtype)
+        for j in range(self.k):
+            ids |= np.left_shift(padded[j : j + width], self.k - 1 - j, dtype=dtype)
+        return ids
+
+    def apply_rule(self, rule: np.ndarray) -> "CALightCone":
+        assert len(rule) == 2**self.k
+        rule = np.asarray(rule, dtype=np.uint8)
+        n, background = self.ncells, self.background
+        self.background = int(rule[background * (2**self.k - 1)])
+
+        if self.active is None or self.active[1] - self.active[0] + self.k - 1 >= n:
+            cells = self.diff ^ np.uint8(background)
+            padded = np.concatenate((cells[n - self.left :], cells, cells[: self.right]))
+            self.diff = rule[self.window_ids(padded)] ^ np.uint8(self.background)
+            self.trim(0, n)
+            return self
+
+        lo, hi = self.active
+        if lo == hi:
+            return self
+        lo, hi = lo - self.right, hi + self.left
+        index = np.arange(lo - self.left, hi + self.right) % n
+        padded = self.diff[index] ^ np.uint8(background)
+        new = rule[self.window_ids(padded)] ^ np.uint8(self.background)
+        # cells outside the interval went from the old background to the new one, diff 0 either way
+        self.diff[index[self.left : self.left + hi - lo]] = new
+        self.trim(lo, hi)
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        out[...] = self.apply_rule(rule).cells
+
+
+if __name__ == "__main__":
+    from automata.inplace import CAInPlace
+    from automata.reference import test, time
+
+    test(CALightCone)
+    test(CALightCone, rule_id=1, k=5)
+    for CAutomaton in (CAInPlace, CALightCone):
+        time(CAutomaton, 1000, ncells=10**6, rule_id=30)
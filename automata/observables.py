@@ -0,0 +1,164 @@
+import multiprocessing as mp
+import zlib
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+from automata.inplace import CAInPlace
+
+
+class Observable(ABC):
+    """Something measured on every generation as it is produced, in memory that doesn't grow with
+    the number of generations: ``update`` is given each generation's cells, which it must not
+    keep, and ``value`` returns the measurement so far."""
+
+    name = ""
+
+    @abstractmethod
+    def update(self, cells: np.ndarray) -> None: ...
+
+    @abstractmethod
+    def value(self) -> float: ...
+
+
+class Density(Observable):
+    """Mean fraction of live cells over the generations seen."""
+
+    name = "density"
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, cells: np.ndarray) -> None:
+        self.total += np.count_nonzero(cells) / len(cells)
+        self.count += 1
+
+    def value(self) -> float:
+        return self.total / max(self.count, 1)
+
+
+class BlockEntropy(Observable):
+    """Shannon entropy in bits per cell of the ``block``-cell words of each generation, counted
+    around the ring and averaged over the generations seen."""
+
+    name = "entropy"
+
+    def __init__(self, block: int = 8) -> None:
+        self.block = block
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, cells: np.ndarray) -> None:
+        ids = np.zeros(len(cells), dtype=np.min_scalar_type(2**self.block - 1))
+        for j in range(self.block):
+            ids |= np.left_shift(np.roll(cells, -j), j, dtype=ids.dtype)
+        p = np.bincount(ids, minlength=2**self.block) / len(cells)
+        p = p[p > 0]
+        self.total += float(-(p * np.log2(p)).sum()) / self.block
+        self.count += 1
+
+    def value(self) -> float:
+        return self.total / max(self.count, 1)
+
+
+class Damage(Observable):
+    """Mean fraction of cells that differ between the run and a ``twin`` of it started with one
+    cell flipped, which is stepped with ``rule`` alongside. The mean rather than the last distance,
+    since damage can cancel out on a ring (rule 90 on 1024 cells heals at generation 512)."""
+
+    name = "damage"
+
+    def __init__(self, twin: Any, rule: Any) -> None:
+        self.twin = twin
+        self.rule = rule
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, cells: np.ndarray) -> None:
+        if self.count:
+            self.twin.apply_rule(self.rule)
+        self.total += np.count_nonzero(np.asarray(self.twin.cells) != cells) / len(cells)
+        self.count += 1
+
+    def value(self) -> float:
+        return self.total / max(self.count, 1)
+
+
+class Compression(Observable):
+    """Compressed over raw size of the bit-packed generations, streamed through zlib."""
+
+    name = "compression"
+
+    def __init__(self, level: int = 6) -> None:
+        self.compressor = zlib.compressobj(level)
+        self.raw = 0
+        self.compressed = 0
+
+    def update(self, cells: np.ndarray) -> None:
+        packed = np.packbits(cells).tobytes()
+        self.raw += len(packed)
+        self.compressed += len(self.compressor.compress(packed))
+
+    def value(self) -> float:
+        # flushing a copy leaves the stream open for more generations
+        tail = self.compressor.copy().flush()
+        return (self.compressed + len(tail)) / max(self.raw, 1)
+
+
+def observe(ca: Any, rule: Any, steps: int, observables: Sequence[Observable]) -> dict[str, float]:
+    """Run ``steps`` generations of ``ca``, feeding its initial state and every generation to
+    each observable, and return their values by name."""
+    for observable in observables:
+        observable.update(np.asarray(ca.cells))
+    for _ in range(steps):
+        ca.apply_rule(rule)
+        for observable in observables:
+            observable.update(np.asarray(ca.cells))
+    return {observable.name: observable.value() for observable in observables}
+
+
+def measure_rule(
+    rule_id: int, ncells: int, k: int, steps: int, seed: int, CAutomaton: Any = CAInPlace
+) -> dict[str, Any]:
+    init = np.random.default_rng(seed).integers(0, 2, size=ncells).astype(np.uint8)
+    flipped = init.copy()
+    flipped[ncells // 2] ^= 1
+    rule = CAutomaton.make_rule(rule_id, k)
+    observables = [
+        Density(),
+        BlockEntropy(),
+        Damage(CAutomaton(ncells, k, flipped), rule),
+        Compression(),
+    ]
+    return {"rule": rule_id, **observe(CAutomaton(ncells, k, init), rule, steps, observables)}
+
+
+def classify(
+    rule_ids: Iterable[int],
+    ncells: int = 1024,
+    k: int = 3,
+    steps: int = 512,
+    seed: int = 0,
+    processes: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Observables of every rule from the same random initial state, the rules spread over a
+    process pool."""
+    measure = partial(measure_rule, ncells=ncells, k=k, steps=steps, seed=seed)
+    with mp.get_context().Pool(processes) as pool:
+        return pool.map(measure, rule_ids)
+
+
+def table(rows: list[dict[str, Any]]) -> str:
+    columns = list(rows[0])
+    lines = ["".join(f"{c:>12}" for c in columns)]
+    for row in rows:
+        cells = [f"{row[c]:>12}" if c == "rule" else f"{row[c]:>12.4f}" for c in columns]
+        lines.append("".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(table(classify(range(256))))
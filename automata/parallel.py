@@ -0,0 +1,207 @@
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Barrier
+from timeit import default_timer
+from typing import Any, Optional
+
+import numpy as np
+
+from automata.reference import CARef, init_cells
+
+STEP, STOP = 0, 1
+
+
+def attach(name: str, shape: tuple[int, ...], dtype: Any) -> tuple[SharedMemory, np.ndarray]:
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def slab_worker(
+    names: tuple[str, str, str],
+    ncells: int,
+    k: int,
+    lo: int,
+    hi: int,
+    start: Barrier,
+    step: Barrier,
+    done: Barrier,
+) -> None:
+    """Advance cells ``[lo, hi)`` whenever the parent lets ``start`` go, reading the halos of
+    the neighbouring slabs from the shared state and waiting on ``step`` after each generation."""
+    shm_cells, cells = attach(names[0], (2, ncells), np.uint8)
+    shm_rule, rule = attach(names[1], (2**k,), np.uint8)
+    shm_control, control = attach(names[2], (3,), np.int64)
+    left, right = (k - 1) // 2, k // 2
+    size = hi - lo
+    left_halo = np.arange(lo - left, lo) % ncells
+    right_halo = np.arange(hi, hi + right) % ncells
+    padded = np.empty(size + k - 1, dtype=np.uint8)
+    ids = np.empty(size, dtype=np.min_scalar_type(2**k - 1))
+    scratch = np.empty_like(ids)
+
+    while True:
+        start.wait()
+        command, steps, parity = control
+        if command == STOP:
+            break
+        for _ in range(steps):
+            src = cells[parity]
+            padded[:left] = src[left_halo]
+            padded[left : left + size] = src[lo:hi]
+            padded[left + size :] = src[right_halo]
+            ids[...] = 0
+            for j in range(k):
+                offset = left + right - j
+                np.left_shift(padded[offset : offset + size], j, out=scratch, dtype=ids.dtype)
+                ids |= scratch
+            np.take(rule, ids, out=cells[1 - parity, lo:hi])
+            parity ^= 1
+            step.wait()
+        done.wait()
+
+    del cells, rule, control
+    for shm in (shm_cells, shm_rule, shm_control):
+        shm.close()
+
+
+class CAParallel(CARef):
+    """The ring split into ``nworkers`` contiguous slabs, each advanced by its own process.
+
+    The state lives in two shared-memory rows that the workers read from and write to in turn;
+    each worker copies the ``k // 2`` cells on either side of its slab from the current row, so
+    no neighbourhood index array is ever built. Call ``close`` (or use it as a context manager)
+    to stop the workers and free the shared memory. By default there is a worker per CPU, as
+    long as every slab stays wider than its halos.
+    """
+
+    def __init__(self, ncells: int, k: int, init: Any = "center", nworkers: int = 0) -> None:
+        self.ncells = ncells
+        self.k = k
+        self.nworkers = nworkers or max(min(mp.cpu_count(), ncells // k), 1)
+        assert ncells >= self.nworkers * k, "each slab needs to be wider than its halos"
+        self.parity = 0
+        self.workers: list[Any] = []
+        self.shm: list[SharedMemory] = []
+        try:
+            self.setup(init)
+        except BaseException:
+            for worker in self.workers:
+                worker.terminate()
+                worker.join()
+            self.workers = []
+            self.release()
+            raise
+
+    def setup(self, init: Any) -> None:
+        ncells, k = self.ncells, self.k
+        for size in (2 * ncells, 2**k, 3 * 8):
+            self.shm.append(SharedMemory(create=True, size=size))
+        self.state = np.ndarray((2, ncells), dtype=np.uint8, buffer=self.shm[0].buf)
+        self.rule = np.ndarray((2**k,), dtype=np.uint8, buffer=self.shm[1].buf)
+        self.control = np.ndarray((3,), dtype=np.int64, buffer=self.shm[2].buf)
+
+        self.state[0] = init_cells(init, ncells)
+
+        ctx = mp.get_context()
+        self.start = ctx.Barrier(self.nworkers + 1)
+        self.step = ctx.Barrier(self.nworkers)
+        self.done = ctx.Barrier(self.nworkers + 1)
+        bounds = np.linspace(0, ncells, self.nworkers + 1).astype(int)
+        names = tuple(shm.name for shm in self.shm)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            worker = ctx.Process(
+                target=slab_worker,
+                args=(names, ncells, k, lo, hi, self.start, self.step, self.done),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k))
+
+    @property
+    def cells(self) -> np.ndarray:
+        cells: np.ndarray = self.state[self.parity].copy()
+        return cells
+
+    @cells.setter
+    def cells(self, cells: Any) -> None:
+        self.state[self.parity] = cells
+
+    def advance(self, rule: np.ndarray, steps: int) -> "CAParallel":
+        assert len(rule) == 2**self.k
+        self.rule[...] = rule
+        self.control[...] = (STEP, steps, self.parity)
+        self.start.wait()
+        self.done.wait()
+        self.parity ^= steps & 1
+        return self
+
+    def apply_rule(self, rule: np.ndarray) -> "CAParallel":
+        return self.advance(rule, 1)
+
+    def release(self) -> None:
+        """Drop the views into the shared memory, then close and unlink it."""
+        for name in ("state", "rule", "control"):
+            vars(self).pop(name, None)
+        for shm in self.shm:
+            shm.close()
+            shm.unlink()
+        self.shm = []
+
+    def close(self) -> None:
+        # __init__ may have failed before starting the workers or creating the shared memory
+        if getattr(self, "workers", None):
+            self.control[0] = STOP
+            self.start.wait()
+            for worker in self.workers:
+                worker.join()
+            self.workers = []
+        if getattr(self, "shm", None):
+            self.release()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __enter__(self) -> "CAParallel":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def scaling(
+    ncells: int = 10**7, steps: int = 20, max_workers: Optional[int] = None, rule_id: int = 110
+) -> None:
+    """Print strong scaling (fixed ring, more workers) and weak scaling (fixed slab per worker)."""
+    max_workers = max_workers or mp.cpu_count()
+    rule = CARef.make_rule(rule_id, 3)
+    for kind in ("strong", "weak"):
+        base = None
+        for nworkers in range(1, max_workers + 1):
+            size = ncells if kind == "strong" else ncells * nworkers
+            with CAParallel(size, 3, "random", nworkers) as ca:
+                ca.advance(rule, 1)
+                start = default_timer()
+                ca.advance(rule, steps)
+                elapsed = (default_timer() - start) / steps
+            base = base or elapsed
+            efficiency = base / elapsed / (nworkers if kind == "strong" else 1)
+            print(
+                f"{kind} {nworkers} workers, {size} cells: "
+                f"{elapsed:.2e} s/step, {size / elapsed:.2e} cells/s, efficiency {efficiency:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    from automata.reference import test
+
+    class CAParallel3(CAParallel):
+        def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+            CAParallel.__init__(self, ncells, k, init, nworkers=3)
+
+    test(CAParallel3)
+    test(CAParallel3, 1234567, 5)
+    scaling()
@@ -0,0 +1,175 @@
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Union
+
+import numpy as np
+
+from automata.history import HistoryStore
+
+History = Union[np.ndarray, HistoryStore]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_SIZE = 2**20
+# bytes packed with bitorder="little" to PNG's most-significant-first order, live cells black
+PNG_BYTES = ~np.packbits(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)[:, ::-1])
+
+
+def png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def write_png(
+    f: BinaryIO,
+    blocks: Iterable[np.ndarray],
+    width: int,
+    height: int,
+    bitdepth: int,
+    level: int = 6,
+) -> None:
+    """Greyscale PNG from blocks of rows already laid out as PNG samples, compressed as they come
+    and written in IDAT chunks of about ``IDAT_SIZE`` bytes."""
+    f.write(PNG_SIGNATURE)
+    f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bitdepth, 0, 0, 0, 0)))
+    compressor = zlib.compressobj(level)
+    pending: list[bytes] = []
+    size = 0
+    for block in blocks:
+        filtered = np.zeros((len(block), block.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 1:] = block
+        data = compressor.compress(filtered.tobytes())
+        pending.append(data)
+        size += len(data)
+        if size >= IDAT_SIZE:
+            f.write(png_chunk(b"IDAT", b"".join(pending)))
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    f.write(png_chunk(b"IDAT", b"".join(pending)))
+    f.write(png_chunk(b"IEND", b""))
+
+
+def history_shape(history: History) -> tuple[int, int]:
+    if isinstance(history, HistoryStore):
+        return len(history), history.ncells
+    nrows, ncells = history.shape
+    return nrows, ncells
+
+
+def cell_blocks(history: History, rows: int) -> Iterator[np.ndarray]:
+    nrows, _ = history_shape(history)
+    for start in range(0, nrows, rows):
+        stop = min(start + rows, nrows)
+        if isinstance(history, HistoryStore):
+            yield history.rows(start, stop)
+        else:
+            yield np.asarray(history[start:stop], dtype=np.uint8)
+
+
+def bilevel_blocks(history: History, rows: int) -> Iterator[np.ndarray]:
+    """1-bit PNG rows of ``history``, straight from the packed bytes of a ``HistoryStore``."""
+    if not isinstance(history, HistoryStore):
+        for block in cell_blocks(history, rows):
+            yield np.packbits(block == 0, axis=1)
+        return
+    for start in range(0, len(history), rows):
+        yield PNG_BYTES[history.packed_rows(start, min(start + rows, len(history)))]
+
+
+def block_average(grey: np.ndarray, factor: int) -> np.ndarray:
+    """Mean of every ``factor × factor`` block, the blocks at the bottom and right edges being
+    whatever is left over."""
+    h, w = grey.shape
+    starts_y, starts_x = np.arange(0, h, factor), np.arange(0, w, factor)
+    sums = np.add.reduceat(np.add.reduceat(grey.astype(np.uint32), starts_y, axis=0), starts_x, 1)
+    counts = np.outer(np.diff(starts_y, append=h), np.diff(starts_x, append=w))
+    means: np.ndarray = (sums + counts // 2) // counts
+    return means.astype(np.uint8)
+
+
+def grey(cells: np.ndarray) -> np.ndarray:
+    return np.where(cells, 0, 255).astype(np.uint8)
+
+
+def rasterise(history: History, path: Union[str, Path], scale: int = 1, rows: int = 4096) -> None:
+    """Spacetime diagram of ``history``, time flowing down and live cells black: one bit per cell,
+    or with ``scale > 1`` one grey pixel per ``scale × scale`` block of cells. The history is read
+    ``rows`` generations at a time, so it can be far larger than memory."""
+    nrows, ncells = history_shape(history)
+    with open(path, "wb") as f:
+        if scale == 1:
+            write_png(f, bilevel_blocks(history, rows), ncells, nrows, 1)
+            return
+        rows = max(rows // scale, 1) * scale
+        blocks = (block_average(grey(cells), scale) for cells in cell_blocks(history, rows))
+        write_png(f, blocks, -(-ncells // scale), -(-nrows // scale), 8)
+
+
+class Pyramid:
+    """Tiles of ``tile × tile`` pixels at ``directory/<level>/<row>_<col>.png``, level 0 showing a
+    pixel per cell and each level above it half the resolution of the one below, up to the level
+    that fits in a single tile.
+
+    The history is read once, a band of ``tile`` rows at a time: every band is cut into tiles and
+    block-averaged into half a band of the next level, so at most a band per level is in memory.
+    """
+
+    def __init__(self, history: History, directory: Union[str, Path], tile: int = 256) -> None:
+        assert tile % 2 == 0
+        self.history = history
+        self.directory = Path(directory)
+        self.tile = tile
+        nrows, ncells = history_shape(history)
+        self.nlevels = 1
+        while max(nrows, ncells) > tile << (self.nlevels - 1):
+            self.nlevels += 1
+        self.pending: list[list[np.ndarray]] = [[] for _ in range(self.nlevels)]
+        self.bands = [0] * self.nlevels
+
+    def build(self) -> "Pyramid":
+        for level in range(self.nlevels):
+            (self.directory / str(level)).mkdir(parents=True, exist_ok=True)
+        for cells in cell_blocks(self.history, self.tile):
+            self.push(0, grey(cells))
+        for level in range(self.nlevels):
+            if sum(len(r) for r in self.pending[level]):
+                self.emit(level, np.concatenate(self.pending[level]))
+                self.pending[level] = []
+        return self
+
+    def push(self, level: int, rows: np.ndarray) -> None:
+        self.pending[level].append(rows)
+        if sum(len(r) for r in self.pending[level]) >= self.tile:
+            band = np.concatenate(self.pending[level])
+            # an empty remainder would be flushed by ``build`` as a band of height 0
+            self.pending[level] = [band[self.tile :]] if len(band) > self.tile else []
+            self.emit(level, band[: self.tile])
+
+    def emit(self, level: int, band: np.ndarray) -> None:
+        for col, start in enumerate(range(0, band.shape[1], self.tile)):
+            tile = band[:, start : start + self.tile]
+            name = self.directory / str(level) / f"{self.bands[level]}_{col}.png"
+            with open(name, "wb") as f:
+                write_png(f, [tile], tile.shape[1], len(tile), 8)
+        self.bands[level] += 1
+        if level + 1 < self.nlevels:
+            self.push(level + 1, block_average(band, 2))
+
+
+if __name__ == "__main__":
+    import tempfile
+    from timeit import default_timer
+
+    from automata.bitpacked import CABitPacked
+    from automata.history import record
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ca = CABitPacked(10**4, 3, init="random")
+        store = record(HistoryStore.create(Path(tmp) / "h", 10**4), ca, ca.make_rule(110, 3), 9999)
+        for name, scale in (("full.png", 1), ("tenth.png", 10)):
+            start = default_timer()
+            rasterise(store, Path(tmp) / name, scale)
+            size = (Path(tmp) / name).stat().st_size
+            print(f"{name}: 10^8 cells in {default_timer() - start:.2f} s, {size} bytes")
+        start = default_timer()
+        pyramid = Pyramid(store, Path(tmp) / "tiles").build()
+        print(f"{pyramid.nlevels}-level pyramid in {default_timer() - start:.2f} s")
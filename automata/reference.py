@@ -0,0 +1,200 @@
+from random import randint
+from timeit import timeit
+from typing import Any, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from automata.runner import Runner
+
+# The implementations from bodies/20150904_automata_opt.py, importable so that new engines can
+# be checked and timed against them.
+
+
+def rolling_window(arr: list[int], wsize: int) -> Iterator[list[int]]:
+    arr = arr[-wsize // 2 + 1 :] + arr + arr[: wsize // 2]
+    for i in range(len(arr) - wsize + 1):
+        yield arr[i : i + wsize]
+
+
+def rolling_window_np(arr: np.ndarray, wsize: int) -> np.ndarray:
+    arr = np.concatenate((arr[-wsize // 2 + 1 :], arr, arr[: wsize // 2]))
+    shape = arr.shape[:-1] + (arr.shape[-1] - wsize + 1, wsize)
+    strides = arr.strides + (arr.strides[-1],)
+    return np.lib.stride_tricks.as_strided(arr, shape=shape, strides=strides)
+
+
+class CARef:
+    # a list here; the engines built on it keep an array, or a property over their own storage
+    cells: Any
+
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        self.ncells = ncells
+        self.k = k
+
+        if isinstance(init, str) and init == "center":
+            self.cells = [0] * self.ncells
+            self.cells[self.ncells // 2] = 1
+        elif isinstance(init, str) and init == "random":
+            self.cells = [randint(0, 1) for _ in range(self.ncells)]
+        else:
+            self.cells = [int(c) for c in init]
+            assert len(self.cells) == self.ncells
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> Any:
+        rule_len = 2**k
+        rule = list(map(int, bin(rule_id)[2:]))
+        rule = [0] * (rule_len - len(rule)) + rule
+        rule = rule[::-1]
+        return rule
+
+    def state_id(self, state: Sequence[int]) -> int:
+        assert len(state) == self.k
+        return int("".join(map(str, state)), base=2)
+
+    def apply_rule(self, rule: Any) -> "CARef":
+        assert len(rule) == 2**self.k
+        self.cells = [rule[self.state_id(w)] for w in rolling_window(self.cells, self.k)]
+        return self
+
+
+def init_cells(
+    init: Any,
+    shape: Union[int, tuple[int, ...]],
+    states: int = 2,
+    batch: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """The engines' ``init`` argument as a uint8 array of ``shape``.
+
+    ``'center'`` sets the middle cell, ``'random'`` draws every cell from ``range(states)`` and
+    anything else is taken as the cells themselves. ``batch`` prepends an axis of that many
+    members, each with its own middle cell or draw.
+    """
+    shape = (shape,) if isinstance(shape, int) else shape
+    full = shape if batch is None else (batch, *shape)
+    cells: np.ndarray
+    if isinstance(init, str) and init == "center":
+        cells = np.zeros(full, dtype=np.uint8)
+        middle = tuple(n // 2 for n in shape)
+        cells[(...,) + middle] = 1
+    elif isinstance(init, str) and init == "random":
+        if rng is None:
+            cells = np.random.randint(0, states, size=full).astype(np.uint8)
+        else:
+            cells = rng.integers(0, states, size=full, dtype=np.uint8)
+    else:
+        cells = np.array(init, dtype=np.uint8)
+        if batch is not None:
+            cells = cells.reshape(full)
+        assert cells.shape == full and cells.max(initial=0) < states
+    return cells
+
+
+class CAOpt1(CARef):
+    def state_id(self, state: Sequence[int]) -> int:
+        assert len(state) == self.k
+        sid = 0
+        for i, j in enumerate(reversed(state)):
+            sid |= j << i
+        return sid
+
+
+class CAOpt2(Runner, CARef):
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        CARef.__init__(self, ncells, k, init)
+        self.cells = np.array(self.cells, dtype=np.byte)
+        self.base = np.arange(self.k)[::-1]
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k))
+
+    def apply_rule(self, rule: np.ndarray) -> "CAOpt2":
+        assert len(rule) == 2**self.k
+        rule = np.asarray(rule, dtype=np.uint8)
+        states = rolling_window_np(self.cells, self.k)
+        state_ids = np.bitwise_or.reduce(states << self.base, axis=1)
+        self.cells = rule[state_ids]
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        states = rolling_window_np(self.cells, self.k)
+        np.take(rule, np.bitwise_or.reduce(states << self.base, axis=1), out=out)
+        self.cells = out
+
+
+class CAOpt3(Runner, CARef):
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        self.ncells = ncells
+        self.k = k
+        self.base = np.arange(self.k)[::-1]
+        self.neigh = rolling_window_np(np.arange(self.ncells), self.k)
+
+        if isinstance(init, str) and init == "center":
+            self.cells = np.zeros(self.ncells, dtype=np.byte)
+            self.cells[self.ncells // 2] = 1
+        elif isinstance(init, str) and init == "random":
+            self.cells = np.random.randint(0, 2, size=self.ncells).astype(np.byte)
+        else:
+            self.cells = np.array(init)
+            assert len(self.cells) == self.ncells
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        return np.array(CARef.make_rule(rule_id, k))
+
+    def apply_rule(self, rule: np.ndarray) -> "CAOpt3":
+        assert len(rule) == 2**self.k
+        rule = np.asarray(rule, dtype=np.uint8)
+        states = self.cells[self.neigh]
+        state_ids = np.bitwise_or.reduce(states << self.base, axis=1)
+        self.cells = rule[state_ids]
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        states = self.cells[self.neigh]
+        np.take(rule, np.bitwise_or.reduce(states << self.base, axis=1), out=out)
+        self.cells = out
+
+
+def test(CACmp: Any, rule_id: int = 126, k: int = 3, ncells: int = 255, niter: int = 100) -> None:
+    rule_ref = CARef.make_rule(rule_id, k)
+    rule_cmp = CACmp.make_rule(rule_id, k)
+    assert all(i == j for i, j in zip(rule_ref, rule_cmp))
+
+    caref = CARef(ncells, k)
+    cacmp = CACmp(ncells, k)
+    assert all(i == j for i, j in zip(caref.cells, cacmp.cells))
+
+    for i in range(niter):
+        caref.apply_rule(rule_ref)
+        cacmp.apply_rule(rule_cmp)
+        assert all(i == j for i, j in zip(caref.cells, cacmp.cells))
+
+    caref = CARef(ncells, k, init="random")
+    cacmp = CACmp(ncells, k, init=caref.cells)
+    assert all(i == j for i, j in zip(caref.cells, cacmp.cells))
+
+    for i in range(niter):
+        caref.apply_rule(rule_ref)
+        cacmp.apply_rule(rule_cmp)
+        assert all(i == j for i, j in zip(caref.cells, cacmp.cells))
+
+    print("All tests passed.")
+
+
+def time(
+    CAutomaton: Any, number_of_loops: int, ncells: int = 250, k: int = 3, rule_id: int = 126
+) -> float:
+    prep = ";".join(
+        [f"ca = CAutomaton({ncells}, {k})", f"rule = CAutomaton.make_rule({rule_id}, {k})"]
+    )
+    main = "ca.apply_rule(rule)"
+
+    total_time = timeit(main, prep, number=number_of_loops, globals={"CAutomaton": CAutomaton})
+    avg_time = total_time / number_of_loops
+
+    res = "{} loops, total {:.2e} s, avg. {:.2e} s/loop"
+    print(res.format(number_of_loops, total_time, avg_time))
+    return avg_time
@@ -0,0 +1,127 @@
+import zlib
+from timeit import default_timer
+from typing import Any, Optional
+
+import numpy as np
+
+
+class Rule30:
+    """Random bits from the centre columns of many independent rule 30 rings.
+
+    The rings are bit-sliced: row ``i`` of ``rows`` holds cell ``i`` of every ring, 64 rings per
+    uint64, so a generation of all of them is ``left ^ (centre | right)`` on whole rows, with no
+    shifts, and yields one word of output per 64 rings. ``taps`` columns, spread evenly around
+    each ring, are read per generation; the centre column alone (``taps=1``) is the classic
+    generator. Each ring starts from random cells drawn from ``seed`` and is run ``width``
+    generations before any output, so that every output bit depends on the whole ring.
+    """
+
+    def __init__(
+        self, seed: Optional[int] = None, width: int = 64, lanes: int = 2**16, taps: int = 1
+    ) -> None:
+        assert lanes % 64 == 0 and 1 <= taps <= width
+        self.width = width
+        self.nwords = lanes // 64
+        self.taps = 1 + (np.arange(taps) * width // taps + width // 2) % width
+        rng = np.random.default_rng(seed)
+        # two buffers of width + 2 rows, the first and last being ghost copies of the ends
+        self.rows = np.zeros((2, width + 2, self.nwords), dtype=np.uint64)
+        self.rows[0, 1:-1] = rng.integers(0, 2**64, size=(width, self.nwords), dtype=np.uint64)
+        self.scratch = np.empty((width, self.nwords), dtype=np.uint64)
+        self.parity = 0
+        for _ in range(width):
+            self.step()
+
+    def step(self) -> np.ndarray:
+        rows: np.ndarray = self.rows[self.parity]
+        new: np.ndarray = self.rows[1 - self.parity]
+        rows[0] = rows[-2]
+        rows[-1] = rows[1]
+        np.bitwise_or(rows[1:-1], rows[2:], out=self.scratch)
+        np.bitwise_xor(rows[:-2], self.scratch, out=new[1:-1])
+        self.parity ^= 1
+        return new
+
+    def random_raw(self, size: int) -> np.ndarray:
+        """``size`` uint64 words, each 64 bits from one tap of 64 rings at one generation."""
+        per_step = self.nwords * len(self.taps)
+        steps = -(-size // per_step)
+        out = np.empty((steps, len(self.taps), self.nwords), dtype=np.uint64)
+        for t in range(steps):
+            np.take(self.step(), self.taps, axis=0, out=out[t])
+        return out.reshape(-1)[:size]
+
+    def random_bytes(self, size: int) -> np.ndarray:
+        return self.random_raw(-(-size // 8)).view(np.uint8)[:size]
+
+
+def generator(seed: Optional[int] = None, **kwargs: Any) -> np.random.Generator:
+    """A ``numpy.random.Generator`` drawing from ``Rule30``, 8192 words at a time, through
+    randomgen's ``UserBitGenerator`` (numpy itself only takes bit generators written in C)."""
+    try:
+        from randomgen import UserBitGenerator
+    except ImportError as e:
+        raise ImportError("the numpy wrapper needs randomgen (pip install randomgen)") from e
+
+    source = Rule30(seed, **kwargs)
+    buffer: list[int] = []
+
+    def next_raw(voidp: Any) -> int:
+        if not buffer:
+            buffer.extend(source.random_raw(8192).tolist()[::-1])
+        return buffer.pop()
+
+    return np.random.Generator(UserBitGenerator(next_raw, 64))
+
+
+def sanity(data: np.ndarray) -> dict[str, float]:
+    """z-scores that should be small for random bytes: of the count of ones (monobit), of the
+    number of runs of equal bits, of the byte histogram (chi-square, 255 degrees of freedom) and
+    of the correlation between successive bits; and the zlib compression ratio, near 1."""
+    bits = np.unpackbits(data)
+    n = len(bits)
+    ones = int(bits.sum())
+    runs = 1 + int(np.count_nonzero(bits[1:] != bits[:-1]))
+    pi = ones / n
+    counts = np.bincount(data, minlength=256)
+    expected = len(data) / 256
+    chi2 = float(((counts - expected) ** 2 / expected).sum())
+    signs = bits.astype(np.float64) * 2 - 1
+    return {
+        "monobit": (2 * ones - n) / np.sqrt(n),
+        "runs": (runs - 2 * n * pi * (1 - pi)) / (2 * np.sqrt(n) * pi * (1 - pi)),
+        "bytes": (chi2 - 255) / np.sqrt(2 * 255),
+        "serial": float(signs[1:] @ signs[:-1]) / np.sqrt(n - 1),
+        "compression": len(zlib.compress(data.tobytes(), 9)) / len(data),
+    }
+
+
+def check(nbytes: int = 2**24, seed: int = 0, **kwargs: Any) -> None:
+    stats = sanity(Rule30(seed, **kwargs).random_bytes(nbytes))
+    print(", ".join(f"{name} {value:.3f}" for name, value in stats.items()))
+    assert all(abs(stats[name]) < 5 for name in ("monobit", "runs", "bytes", "serial"))
+    assert stats["compression"] > 0.99
+    print("All tests passed.")
+
+
+def throughput(nbytes: int = 2**28, **kwargs: Any) -> float:
+    source = Rule30(0, **kwargs)
+    start = default_timer()
+    source.random_bytes(nbytes)
+    rate = nbytes / (default_timer() - start)
+    print(f"{kwargs or 'defaults'}: {rate / 2**20:.1f} MiB/s")
+    return rate
+
+
+if __name__ == "__main__":
+    from automata.reference import CAOpt3
+
+    check()
+    check(taps=4)
+    ca = CAOpt3(255, 3, init="random")
+    rule = CAOpt3.make_rule(30, 3)
+    start = default_timer()
+    bits = [ca.apply_rule(rule).cells[127] for _ in range(2**14)]
+    print(f"CAOpt3 centre column: {len(bits) / 8 / (default_timer() - start) / 2**10:.1f} KiB/s")
+    for kwargs in ({}, {"taps": 4}, {"taps": 16}, {"width": 128, "taps": 8}):
+        throughput(**kwargs)
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import numpy as np
+
+
+class Runner(ABC):
+    """``run`` for engines that can write their next generation into a given uint8 row.
+
+    Subclasses implement ``step_into(rule, out)``, which advances one generation, stores it in
+    ``out`` and may keep reading from ``out`` as their current state. Generations that are not
+    kept go through the engine's own ``apply_rule``.
+    """
+
+    ncells: int
+    cells: Any
+    apply_rule: Any
+
+    @abstractmethod
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None: ...
+
+    def run(
+        self, rule: Any, steps: int, out: Optional[np.ndarray] = None, every: int = 1
+    ) -> np.ndarray:
+        """Spacetime history of ``steps`` generations, keeping the initial row and every
+        ``every``-th generation after it."""
+        shape = (steps // every + 1, self.ncells)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        assert out.shape == shape and out.dtype == np.uint8
+        rule = np.asarray(rule, dtype=np.uint8)
+
+        out[0] = self.cells
+        for t in range(1, steps + 1):
+            if t % every:
+                self.apply_rule(rule)
+            else:
+                self.step_into(rule, out[t // every])
+        self.cells = np.array(self.cells)
+        return out
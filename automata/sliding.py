@@ -0,0 +1,103 @@
+from timeit import default_timer
+from typing import Any
+
+import numpy as np
+
+from automata.reference import CARef
+from automata.runner import Runner
+
+
+class StateIds:
+    """State ids of every window of ``k`` cells on a ring of ``ncells``, in the smallest unsigned
+    dtype that holds ``2**k - 1``.
+
+    Rather than shifting in the ``k`` cells of every window one by one, ids of width ``2w`` are
+    made from overlapping ids of width ``w`` (``id2w[i] = idw[i] << w | idw[i + w]``) and the ids
+    of width ``k`` are glued together from the power-of-two widths in ``k``'s binary expansion,
+    so a call costs O(log k) vector operations on preallocated buffers.
+    """
+
+    def __init__(self, ncells: int, k: int) -> None:
+        assert 1 <= k <= 64 and k <= ncells
+        self.ncells = ncells
+        self.k = k
+        self.left = (k - 1) // 2
+        self.dtype = np.min_scalar_type(2**k - 1)
+        size = ncells + k - 1
+        self.window = np.empty(size, dtype=self.dtype)
+        self.scratch = np.empty(size, dtype=self.dtype)
+        self.ids = np.empty(ncells, dtype=self.dtype)
+
+    def __call__(self, cells: np.ndarray) -> np.ndarray:
+        n, left, k = self.ncells, self.left, self.k
+        window, scratch, ids = self.window, self.scratch, self.ids
+        window[:left] = cells[n - left :]
+        window[left : left + n] = cells
+        window[left + n :] = cells[: k - 1 - left]
+
+        width, done = 1, 0
+        ids[...] = 0
+        while True:
+            # window[i] is the id of the ``width`` cells starting at padded cell i
+            if k & width:
+                np.left_shift(ids, width, out=ids)
+                ids |= window[done : done + n]
+                done += width
+            if 2 * width > k:
+                return ids
+            valid = len(window) - 2 * width + 1
+            np.left_shift(window[:valid], width, out=scratch[:valid])
+            scratch[:valid] |= window[width : width + valid]
+            window, scratch = scratch, window
+            width *= 2
+
+
+class CASliding(Runner, CARef):
+    """``CAOpt3`` with ids from ``StateIds``, correct for any ``k`` whose rule table fits in
+    memory."""
+
+    def __init__(self, ncells: int, k: int, init: Any = "center") -> None:
+        CARef.__init__(self, ncells, k, init)
+        self.cells = np.array(self.cells, dtype=np.uint8)
+        self.state_ids = StateIds(ncells, k)
+
+    @staticmethod
+    def make_rule(rule_id: int, k: int) -> np.ndarray:
+        data = rule_id.to_bytes(-(-(2**k) // 8), "little")
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")[: 2**k]
+
+    def apply_rule(self, rule: np.ndarray) -> "CASliding":
+        assert len(rule) == 2**self.k
+        self.cells = np.take(np.asarray(rule, dtype=np.uint8), self.state_ids(self.cells))
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        np.take(rule, self.state_ids(self.cells), out=out)
+        self.cells = out
+
+
+def per_cell(ncells: int = 10**6, ks: tuple[int, ...] = (3, 5, 8, 12, 16, 24, 30)) -> None:
+    """Print the time per cell of computing all state ids, ``StateIds`` against ``CAOpt3``'s
+    shift-and-or over gathered windows (with its cells widened so that it doesn't overflow)."""
+    from automata.reference import rolling_window_np
+
+    cells = np.random.randint(0, 2, size=ncells).astype(np.uint8)
+    for k in ks:
+        state_ids = StateIds(ncells, k)
+        start = default_timer()
+        state_ids(cells)
+        sliding = (default_timer() - start) / ncells
+        base = np.arange(k, dtype=np.int64)[::-1]
+        neigh = rolling_window_np(np.arange(ncells), k)
+        start = default_timer()
+        np.bitwise_or.reduce(cells[neigh].astype(np.int64) << base, axis=1)
+        gathered = (default_timer() - start) / ncells
+        print(f"k={k}: sliding {sliding:.2e} s/cell, gathered {gathered:.2e} s/cell")
+
+
+if __name__ == "__main__":
+    from automata.reference import test
+
+    test(CASliding)
+    test(CASliding, rule_id=2**300 + 126, k=12)
+    per_cell()
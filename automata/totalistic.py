@@ -0,0 +1,74 @@
+from typing import Any
+
+import numpy as np
+
+from automata.reference import init_cells
+from automata.runner import Runner
+
+
+class CATotalistic(Runner):
+    """Totalistic and outer-totalistic rules with ``states`` cell states and any window ``k``.
+
+    The window sums come from one cumulative sum over the ring padded with ``k - 1`` wrapped
+    cells, so a step costs O(ncells) whatever ``k`` is. A totalistic rule is a table indexed by the
+    window sum (``make_rule``), an outer-totalistic one a ``(states, len(table))`` array indexed by
+    the cell's own state and the window sum, as in ``CAGraph.apply_outer_totalistic``.
+    """
+
+    def __init__(self, ncells: int, k: int, init: Any = "center", states: int = 2) -> None:
+        assert k <= ncells
+        self.ncells = ncells
+        self.k = k
+        self.states = states
+        self.left = (k - 1) // 2
+        self.nsums = k * (states - 1) + 1
+        total_dtype = np.int32 if (ncells + k) * (states - 1) < 2**31 else np.int64
+        self.padded = np.empty(ncells + k - 1, dtype=np.uint8)
+        self.totals = np.zeros(ncells + k, dtype=total_dtype)
+        self.sums = np.empty(ncells, dtype=total_dtype)
+
+        self.cells = init_cells(init, self.ncells, states)
+
+    @staticmethod
+    def make_rule(code: int, k: int, states: int = 2) -> np.ndarray:
+        """Wolfram's totalistic code: digit ``s`` of ``code`` in base ``states`` is the new state
+        of a cell whose window sums to ``s``."""
+        table = np.zeros(k * (states - 1) + 1, dtype=np.uint8)
+        for s in range(len(table)):
+            code, table[s] = divmod(code, states)
+        return table
+
+    def window_sums(self) -> np.ndarray:
+        n, left = self.ncells, self.left
+        self.padded[:left] = self.cells[n - left :]
+        self.padded[left : left + n] = self.cells
+        self.padded[left + n :] = self.cells[: self.k - 1 - left]
+        np.cumsum(self.padded, out=self.totals[1:])
+        sums: np.ndarray = np.subtract(self.totals[self.k :], self.totals[:n], out=self.sums)
+        return sums
+
+    def lookup(self, rule: Any) -> np.ndarray:
+        rule = np.asarray(rule, dtype=np.uint8)
+        assert rule.shape[-1] == self.nsums
+        if rule.ndim == 1:
+            cells: np.ndarray = rule[self.window_sums()]
+            return cells
+        assert rule.shape[0] == self.states
+        cells = rule[self.cells, self.window_sums()]
+        return cells
+
+    def apply_rule(self, rule: Any) -> "CATotalistic":
+        self.cells = self.lookup(rule)
+        return self
+
+    def step_into(self, rule: np.ndarray, out: np.ndarray) -> None:
+        out[...] = self.lookup(rule)
+        self.cells = out
+
+
+if __name__ == "__main__":
+    from automata.reference import time
+
+    for k in (3, 101, 1001):
+        print(f"k={k}")
+        time(CATotalistic, 100, ncells=10**6, k=k, rule_id=2**k - 1)
@@ -0,0 +1,83 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from timeit import default_timer
+
+PLUGIN = Path(__file__).parent / "a.py"
+
+BASE = '''import enum
+from typing import TypeVar
+
+E = TypeVar("E")
+T = TypeVar("T")
+
+
+class MappingEnumMeta(enum.EnumMeta):
+    def map(cls: type[E], **kwargs: T) -> dict[E, T]:
+        return {member: kwargs[member.name] for member in cls}  # type: ignore
+'''
+
+
+def generate(root: Path, nenums: int = 5000, per_module: int = 50, nmembers: int = 8) -> None:
+    """A package of ``nenums`` ``MappingEnumMeta`` enums, ``per_module`` to a module, each with a
+    module-level call of ``map`` that only type-checks with the plugin's signature."""
+    package = root / "enums"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "base.py").write_text(BASE)
+    members = [f"m{j}" for j in range(nmembers)]
+    for m in range(-(-nenums // per_module)):
+        lines = ["import enum", "", "from enums.base import MappingEnumMeta", ""]
+        for e in range(m * per_module, min((m + 1) * per_module, nenums)):
+            lines += ["", f"class Enum{e}(enum.Enum, metaclass=MappingEnumMeta):"]
+            lines += [f"    {member} = enum.auto()" for member in members]
+            kwargs = ", ".join(f"{member}={j}" for j, member in enumerate(members))
+            lines += ["", f"mapping{e}: dict[Enum{e}, int] = Enum{e}.map({kwargs})", ""]
+        (package / f"module{m}.py").write_text("\n".join(lines))
+    (root / "mypy.ini").write_text(f"[mypy]\nplugins = {PLUGIN.resolve()}\n")
+
+
+def run(args: list[str], cwd: Path) -> float:
+    start = default_timer()
+    result = subprocess.run(args, cwd=cwd, capture_output=True, text=True)
+    elapsed = default_timer() - start
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stdout}{result.stderr}")
+    return elapsed
+
+
+def touch(root: Path) -> None:
+    """Change one module the way an edit would, so that only it and its dependents are stale."""
+    with open(root / "enums" / "module0.py", "a") as f:
+        f.write("\nEXTRA = 1\n")
+
+
+def benchmark(nenums: int = 5000) -> None:
+    mypy = [sys.executable, "-m", "mypy"]
+    dmypy = [sys.executable, "-m", "mypy.dmypy", "--status-file", ".dmypy.json"]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate(root, nenums)
+        timings = {"cold": run([*mypy, "enums"], root), "warm": run([*mypy, "enums"], root)}
+        touch(root)
+        timings["one module changed"] = run([*mypy, "enums"], root)
+
+        shutil.rmtree(root / ".mypy_cache")
+        run([*dmypy, "start"], root)
+        try:
+            timings["dmypy first check"] = run([*dmypy, "check", "enums"], root)
+            timings["dmypy unchanged"] = run([*dmypy, "check", "enums"], root)
+            touch(root)
+            timings["dmypy one module changed"] = run([*dmypy, "check", "enums"], root)
+        finally:
+            run([*dmypy, "stop"], root)
+
+    print(f"{nenums} enums")
+    for name, elapsed in timings.items():
+        print(f"{name:>26}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,80 @@
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Iterable
+
+# a single left-to-right scan: verbatim blocks and the build's hash trailer are kept as is,
+# comments and paragraphs holding nothing else are dropped along with the whitespace around them,
+# and any other whitespace run shrinks to one character
+COMMENT = r"<!--(?![0-9a-f]+-->).*?-->"
+TOKENS = re.compile(
+    rf"""
+    (?P<keep><(?P<tag>pre|script|style|textarea)\b.*?</(?P=tag)\s*>|<!--[0-9a-f]+-->)
+    | (?P<drop>\s*(?:(?:{COMMENT}|<p>(?:\s|{COMMENT})*</p>)\s*)+)
+    | (?P<space>\s+)
+    """,
+    re.S | re.I | re.X,
+)
+VERBATIM = {"pre", "script", "style", "textarea"}
+
+
+def replace(match: re.Match[str]) -> str:
+    kind, text = match.lastgroup, match.group()
+    if kind == "keep":
+        return text
+    if kind == "drop" and not (text[0].isspace() or text[-1].isspace()):
+        return ""
+    return "\n" if "\n" in text else " "
+
+
+def minify(html: str) -> str:
+    return TOKENS.sub(replace, html).strip()
+
+
+class TextExtractor(HTMLParser):
+    """The text of a page as it is laid out: every whitespace run outside verbatim blocks counts
+    as one space, text inside them counts as is."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: list[str] = []
+        self.verbatim = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        self.verbatim += tag in VERBATIM
+
+    def handle_endtag(self, tag: str) -> None:
+        self.verbatim -= tag in VERBATIM
+
+    def handle_data(self, data: str) -> None:
+        self.chunks.append(data if self.verbatim else re.sub(r"\s+", " ", data))
+
+
+def rendered_text(html: str) -> str:
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return re.sub(r"  +", " ", "".join(parser.chunks)).strip()
+
+
+def test(pages: Iterable[Path] = ()) -> None:
+    cases = [
+        "<div>\n    <pre>  indented\n\n\n    <!-- kept -->  </pre>\n</div>",
+        "<p>\n  one <!-- note -->\n  two</p>\n<p>three<!-- note -->four</p>\n<!--0123abcd-->",
+        "<p>\n</p>\n<p>kept</p>  <p></p><p> <!-- note --> </p>\n",
+    ]
+    for page in pages:
+        cases.append(page.read_text())
+    for html in cases:
+        assert rendered_text(minify(html)) == rendered_text(html), html
+        assert minify(minify(html)) == minify(html), html
+
+    assert "<pre>  indented\n\n\n    <!-- kept -->  </pre>" in minify(cases[0])
+    assert "note" not in minify(cases[1]) and minify(cases[1]).endswith("\n<!--0123abcd-->")
+    assert minify(cases[2]) == "<p>kept</p>"
+    print("All tests passed.")
+
+
+if __name__ == "__main__":
+    root = Path(__file__).parent
+    test([*sorted((root / "posts").glob("*.html")), root / "index.html"])
@@ -2,15 +2,56 @@ import html
 import io
 import json
 import sys
-from contextlib import redirect_stdout
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, NoReturn, Iterator
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, NoReturn, Iterator, Optional, TextIO
+
+LOCK_VERSION = 1
 
 
 class NotValid(Exception):
     pass
 
 
+class NotLocked(Exception):
+    pass
+
+
+_sink: ContextVar[Optional[io.StringIO]] = ContextVar("stdout_sink", default=None)
+_install_lock = threading.Lock()
+
+
+class StdoutProxy:
+    """Installed once as ``sys.stdout``, forwarding to the buffer of the capture active in the
+    current thread, or to the original stream outside of one."""
+
+    def __init__(self, stdout: TextIO) -> None:
+        self.stdout = stdout
+
+    def __getattr__(self, name: str) -> Any:
+        sink = _sink.get()
+        return getattr(self.stdout if sink is None else sink, name)
+
+
+@contextmanager
+def capture_stdout() -> Iterator[io.StringIO]:
+    """Collect everything written to ``sys.stdout`` in this thread, whether by ``print``,
+    ``pprint`` or ``sys.stdout.write``, without affecting captures running on other threads."""
+    with _install_lock:
+        if not isinstance(sys.stdout, StdoutProxy):
+            sys.stdout = StdoutProxy(sys.stdout)
+    buf = io.StringIO()
+    token = _sink.set(buf)
+    try:
+        yield buf
+    finally:
+        _sink.reset(token)
+
+
 @dataclass(frozen=True)
 class Comment:
     content: str
@@ -38,8 +79,7 @@ class Code:
         raise NotValid()
 
     def exec(self, globals_: dict[str, Any]) -> "Stdout":
-        stdout = io.StringIO()
-        with redirect_stdout(stdout):
+        with capture_stdout() as stdout:
             try:
                 exec(self.content, globals_)
             except:
@@ -127,15 +167,52 @@ def parse_line_stream(lines: Iterator[str]) -> list[Renderable]:
     return elements
 
 
-def render_file(path: str) -> tuple[str, dict[str, Any]]:
+def cell_hash(content: str, previous: str = "") -> str:
+    return sha256((previous + content).encode()).hexdigest()
+
+
+def lock_path(path: str | Path) -> Path:
+    return Path(path).with_suffix(".lock.json")
+
+
+def read_lock(path: str | Path) -> dict[str, str]:
+    lock_file = lock_path(path)
+    if not lock_file.is_file():
+        return {}
+    with open(lock_file) as f:
+        lock = json.load(f)
+    if lock.get("version") != LOCK_VERSION:
+        raise NotLocked(f"{lock_file}: unsupported lockfile version {lock.get('version')}")
+    outputs: dict[str, str] = lock["outputs"]
+    return outputs
+
+
+def write_lock(path: str | Path, outputs: dict[str, str]) -> None:
+    with open(lock_path(path), "w") as f:
+        json.dump({"version": LOCK_VERSION, "outputs": outputs}, f, indent=4)
+        f.write("\n")
+
+
+def render_file(path: str | Path, frozen: bool = False) -> tuple[str, dict[str, Any]]:
     out = []
     with open(path) as f:
         els = parse_line_stream(f)
     metadata = els.pop(0)
     assert isinstance(metadata, Comment), "File must start with a comment block"
     gl: dict[str, Any] = {}
+    locked = read_lock(path) if frozen else {}
+    outputs: dict[str, str] = {}
+    h = ""
     for el in els:
         out.append(el.render())
         if isinstance(el, Code):
-            out.append(el.exec(gl).render())
+            # chained so that editing a cell also invalidates every cell after it
+            h = cell_hash(el.content, h)
+            if frozen and h not in locked:
+                raise NotLocked(f"{path}: no locked output for cell\n{el.content}")
+            stdout = Stdout(locked[h]) if frozen else el.exec(gl)
+            outputs[h] = stdout.content
+            out.append(stdout.render())
+    if not frozen and outputs:
+        write_lock(path, outputs)
     return "\n".join(out), json.loads(metadata.content)
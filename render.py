@@ -1,7 +1,6 @@
-from contextlib import redirect_stdout
+from functools import partial
 from textwrap import dedent
 import py2html
-import io
 import re
 
 
@@ -11,23 +10,26 @@ def replace_many(s, olds, news):
     return s
 
 
-def check_output(code, data):
-    buf = io.StringIO()
-    with redirect_stdout(buf):
-        exec(dedent(code), {}, {**data, "render_template": render_template})
+def check_output(code, data, frozen=False):
+    with py2html.capture_stdout() as buf:
+        exec(
+            dedent(code),
+            {},
+            {**data, "render_template": partial(render_template, frozen=frozen)},
+        )
     return buf.getvalue()
 
 
-def render_template(path, data=None):
+def render_template(path, data=None, frozen=False):
     data = data or {}
     with open(path) as fin:
         if path.endswith(".py"):
-            template, data = py2html.render_file(path)
+            template, data = py2html.render_file(path, frozen)
         else:
             template = fin.read()
 
     code_blocks = re.findall(r"{{.+?}}", template, re.S)
     rendered = (
-        check_output(block.lstrip("{").rstrip("}"), data) for block in code_blocks
+        check_output(block.lstrip("{").rstrip("}"), data, frozen) for block in code_blocks
     )
     return replace_many(template, code_blocks, rendered)